@@ -0,0 +1,422 @@
+"""
+Benchmarks e verificações do pipeline local de reels.
+
+Uso:
+    python benchmarks.py parity <video> [--template reels_modelo_1] [--title "..."]
+    python benchmarks.py composite <video> [--frames 150]
+    python benchmarks.py segments <video> [--counts 1 2 4] [--profile standard]
+    python benchmarks.py frames <video> [<video> ...] [--repeat 5]
+    python benchmarks.py truncate [--lengths 80 140 200 300] [--repeat 50]
+    python benchmarks.py autofit [--template reels_modelo_1] [--family overlay] [--repeat 20]
+                                 [--headlines manchetes.txt]
+    python benchmarks.py decode <foto.jpg> [--repeat 3]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import main
+
+logging.getLogger().setLevel(logging.WARNING)
+
+DEFAULT_TITLE = "Casos De Dengue DISPARAM Em Maceió E Hospital Soa Alerta Para A População..."
+
+# Manchetes SINTÉTICAS no formato do Tribuna Hoje: os títulos de exemplo do app mais
+# pautas inventadas, curtas e longas. Não são manchetes publicadas; para medir com
+# manchetes reais passe um arquivo com uma por linha (autofit --headlines).
+SYNTHETIC_HEADLINES = [
+    DEFAULT_TITLE,
+    "EXCLUSIVO: Casos De Dengue DISPARAM Em Maceió E Hospital Soa Alerta...",
+    "URGENTE: MPF Impõe Regras Mais Rígidas Para Construções Na Orla...",
+    "CONFIRMADO: Motoristas De Aplicativo Precisam Regularizar MEI...",
+    "Chuva Forte Alaga Ruas Do Centro De Maceió",
+    "Prefeitura Anuncia Novo Calendário De Vacinação Contra A Gripe Em Todos Os Postos Da Capital",
+    "URGENTE: Defesa Civil Emite Alerta Máximo Para Moradores Das Encostas Do Vale Do Reginaldo "
+    "Após Três Dias Seguidos De Chuva Intensa Em Alagoas",
+    "CSA Vence O CRB No Rei Pelé E Assume A Liderança Do Campeonato Alagoano",
+    "Operação Da Polícia Federal Cumpre Mandados Em Arapiraca, Penedo E Maceió Contra Fraudes Em "
+    "Licitações Da Saúde Que Somam Mais De R$ 40 Milhões",
+    "Braskem: Moradores Do Pinheiro Cobram Indenizações",
+    "Concurso Público Da Prefeitura De Maceió Oferece 1.200 Vagas Com Salários De Até R$ 9 Mil",
+    "EXCLUSIVO: Relatório Aponta Que Obras Da Orla Lagunar Estão Paradas Há Oito Meses E Empresa "
+    "Responsável Pede Aditivo Milionário Ao Governo Do Estado",
+]
+
+
+def _legacy_fit_title(text: str, family: str, max_width: float, max_height: float,
+                      max_size: int, line_spacing: float) -> int:
+    """Size search without fit_title_font: step down one px, re-wrapping with fresh measurements"""
+    for size in range(max_size, main.TITLE_MIN_FONT_SIZE - 1, -1):
+        font = main.get_font(family, size)
+        lines, current = [], []
+        for word in text.split():
+            test = ' '.join(current + [word])
+            if current and main._ink_width(font, test) > max_width:
+                lines.append(' '.join(current))
+                current = [word]
+            else:
+                current.append(word)
+        if current:
+            lines.append(' '.join(current))
+        if len(lines) * round(size * line_spacing) <= max_height:
+            return size
+    return main.TITLE_MIN_FONT_SIZE
+
+
+def _decode_frames(path: str, times: list, size: tuple) -> list:
+    """Decode RGB frames at the given timestamps (one input-seeked ffmpeg call each)"""
+    width, height = size
+    frames = []
+    for t in times:
+        result = subprocess.run(
+            [main.get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-ss', f"{t:.3f}", '-i', path,
+             '-frames:v', '1', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'],
+            stdout=subprocess.PIPE, check=True
+        )
+        frames.append(np.frombuffer(result.stdout, dtype=np.uint8).reshape(height, width, 3))
+    return frames
+
+
+def _psnr(a: np.ndarray, b: np.ndarray) -> float:
+    mse = np.mean((a.astype(np.float64) - b.astype(np.float64)) ** 2)
+    return float('inf') if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def run_parity(args) -> int:
+    """Render the same input with both engines and compare sampled frames (PSNR)"""
+    template = main.LOCAL_REELS_TEMPLATES[args.template]
+    size = (template['dimensions']['width'], template['dimensions']['height'])
+    workdir = tempfile.mkdtemp(prefix="reels_parity_")
+    try:
+        outputs = {}
+        for engine, render in (('moviepy', main._render_reels_moviepy), ('ffmpeg', main._render_reels_ffmpeg)):
+            out_path = os.path.join(workdir, f"{engine}.mp4")
+            start = time.perf_counter()
+            if not render(args.source, args.title, args.template, out_path):
+                print(f"{engine}: render falhou")
+                return 1
+            elapsed = time.perf_counter() - start
+            info = main.probe_media(out_path)
+            outputs[engine] = (out_path, info)
+            print(f"{engine:8s} {elapsed:7.2f}s  {info['width']}x{info['height']} "
+                  f"{info['fps']}fps {info['duration']:.2f}s audio={info['audio_codec']}")
+
+        duration = min(info['duration'] for _, info in outputs.values())
+        times = [duration * i / (args.samples + 1) for i in range(1, args.samples + 1)]
+        ref = _decode_frames(outputs['moviepy'][0], times, size)
+        new = _decode_frames(outputs['ffmpeg'][0], times, size)
+        scores = [_psnr(a, b) for a, b in zip(ref, new)]
+        for t, score in zip(times, scores):
+            print(f"  t={t:6.2f}s  PSNR {score:6.2f} dB")
+        worst = min(scores)
+        print(f"PSNR mínimo: {worst:.2f} dB (limite {args.min_psnr} dB)")
+        return 0 if worst >= args.min_psnr else 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _composite_worker(mode: str, source: str, template_key: str, title_text: str, frames: int, queue) -> None:
+    """Composite `frames` frames in a fresh process so peak RSS is per mode"""
+    logging.getLogger().setLevel(logging.WARNING)
+    template = main.LOCAL_REELS_TEMPLATES[template_key]
+    width, height = template['dimensions']['width'], template['dimensions']['height']
+    clip = main.mpe.VideoFileClip(source)
+    fps = main._reels_output_fps(clip.fps)
+    times = [i / fps for i in range(frames)]
+    video_box = main._compute_reels_video_box(width, height, clip.w, clip.h)
+    video_w, video_h, video_x, video_y = video_box
+    title = main._build_reels_title_image(title_text, template_key, width)
+
+    if mode == 'composite_clip':
+        # Caminho antigo: fundo + vídeo redimensionado + título como camadas do CompositeVideoClip
+        bg = main.mpe.ImageClip(main._reels_background_path(template_key)).set_duration(clip.duration).resize((width, height))
+        layers = [bg, clip.resize(newsize=(video_w, video_h)).set_position((video_x, video_y))]
+        if title:
+            title_img, title_y = title
+            layers.append(main.mpe.ImageClip(np.asarray(title_img), transparent=True)
+                          .set_duration(clip.duration).set_position((0, title_y)))
+        composed = main.mpe.CompositeVideoClip(layers)
+        render = composed.get_frame
+    else:
+        static_layer = main._build_reels_static_layer(template_key, width, height, title)
+        compositor = main.ReelsFrameCompositor(np.asarray(static_layer), video_box,
+                                               main._reels_title_overlap(title, video_box))
+        render = lambda t: compositor.composite(clip.get_frame(t))
+
+    # Decodificação isolada, para separar o custo do compositor
+    start = time.perf_counter()
+    for t in times:
+        clip.get_frame(t)
+    decode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for t in times:
+        render(t)
+    total_seconds = time.perf_counter() - start
+    result = {
+        'fps': frames / total_seconds,
+        'composite_ms': max(total_seconds - decode_seconds, 0.0) / frames * 1000,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    if mode == 'frame_compositor' and (clip.w, clip.h) != (video_w, video_h):
+        # Parte da composição que ainda aloca por frame: o resize do Pillow
+        start = time.perf_counter()
+        for t in times:
+            frame = clip.get_frame(t)
+            main.Image.fromarray(frame).resize((video_w, video_h), main.Image.LANCZOS)
+        result['resize_ms'] = max(time.perf_counter() - start - decode_seconds, 0.0) / frames * 1000
+    queue.put(result)
+    clip.close()
+
+
+def run_composite(args) -> int:
+    """Frames/sec and peak RSS: CompositeVideoClip vs ReelsFrameCompositor"""
+    ctx = multiprocessing.get_context('spawn')
+    print(f"{args.frames} frames de {args.source} ({args.template})")
+    for mode in ('composite_clip', 'frame_compositor'):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_composite_worker,
+                           args=(mode, args.source, args.template, args.title, args.frames, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+        print(f"{mode:17s} {result['fps']:7.1f} fps  composição {result['composite_ms']:6.2f} ms/frame  "
+              f"pico RSS {result['peak_rss_mb']:7.1f} MB")
+        if 'resize_ms' in result:
+            print(f"{'':17s} dos quais resize Pillow (aloca por frame) {result['resize_ms']:6.2f} ms/frame")
+    return 0
+
+
+def _count_frames(path: str) -> int:
+    result = subprocess.run([main.get_ffmpeg_exe(), '-hide_banner', '-i', path, '-map', '0:v:0', '-f', 'null', '-'],
+                            stderr=subprocess.PIPE, check=True)
+    return int(re.findall(rb'frame=\s*(\d+)', result.stderr)[-1])
+
+
+def run_segments(args) -> int:
+    """Wall time of the ffmpeg engine with N parallel segments (frame count must not change)"""
+    encoding = main.resolve_encoding_profile(args.profile)
+    print(f"{main.available_cpu_count()} CPUs, perfil {args.profile}, {main.probe_media(args.source)['duration']:.1f}s de vídeo")
+    workdir = tempfile.mkdtemp(prefix="reels_segments_")
+    try:
+        baseline = None
+        for count in args.counts:
+            out_path = os.path.join(workdir, f"segments_{count}.mp4")
+            start = time.perf_counter()
+            if not main._render_reels_ffmpeg(args.source, args.title, args.template, out_path,
+                                             encoding, segments=count):
+                print(f"{count} segmentos: render falhou")
+                return 1
+            elapsed = time.perf_counter() - start
+            frames = _count_frames(out_path)
+            baseline = baseline or elapsed
+            print(f"{count:3d} segmentos {elapsed:8.2f}s  {baseline / elapsed:5.2f}x  {frames} frames")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_frames(args) -> int:
+    """Thumbnail frame cost: fixed 1s grab vs best-of-keyframes selection"""
+    for source in args.sources:
+        timings = {}
+        for mode in ('fixed', 'best'):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                image = main.representative_video_frame(source, mode)
+            timings[mode] = (time.perf_counter() - start) / args.repeat * 1000
+            luma = float(np.asarray(image.convert('L')).mean())
+            print(f"{os.path.basename(source):24s} {mode:6s} {timings[mode]:7.1f} ms  luma média {luma:6.1f}")
+        print(f"{'':24s} best/fixed {timings['best'] / timings['fixed']:.2f}x")
+    return 0
+
+
+def _legacy_truncate(text: str, font, max_width: float) -> str:
+    """Truncation loop used before fit_text: one full measurement per removed character"""
+    while text and main.text_width(font, text) > max_width:
+        text = text[:-1]
+    return text
+
+
+def _make_title(length: int, rng: random.Random) -> str:
+    words = DEFAULT_TITLE.rstrip('.').split()
+    title = []
+    while len(' '.join(title)) < length:
+        title.append(rng.choice(words))
+    return ' '.join(title)[:length]
+
+
+def run_truncate(args) -> int:
+    """Title truncation: character-by-character loop vs binary search (fit_text)"""
+    font = main.get_font('overlay', args.font_size)
+    rng = random.Random(42)
+    print(f"fonte {getattr(font, 'path', 'padrão')} {args.font_size}px, largura máxima {args.max_width}px")
+    for length in args.lengths:
+        titles = [_make_title(length, rng) for _ in range(args.repeat)]
+        start = time.perf_counter()
+        for title in titles:
+            _legacy_truncate(title, font, args.max_width)
+        legacy_ms = (time.perf_counter() - start) / len(titles) * 1000
+
+        start = time.perf_counter()
+        fitted = [main.fit_text(title, font, args.max_width) for title in titles]
+        fit_ms = (time.perf_counter() - start) / len(titles) * 1000
+
+        overflow = sum(1 for text in fitted if main.text_width(font, text) > args.max_width)
+        print(f"{length:4d} chars  loop {legacy_ms:8.3f} ms  fit_text {fit_ms:7.3f} ms  "
+              f"{legacy_ms / fit_ms:6.1f}x  estouros {overflow}")
+        if overflow:
+            return 1
+    return 0
+
+
+def run_autofit(args) -> int:
+    """Title auto-fit over the headline corpus: size found, lines and cost per fit"""
+    canvas_height, max_size = (250, 51) if args.template == 'reels_modelo_2' else (400, 50)
+    margin = 90 if args.template == 'reels_modelo_2' else 60
+    max_width = 1080 - margin * 2
+    line_spacing = 70 / max_size
+    if main.resolve_font_path(args.family) is None:
+        # load_default() ignora o tamanho: todos os candidatos sairiam iguais e o tempo não diz nada
+        print(f"fonte '{args.family}' indisponível ({', '.join(main.FONT_FAMILIES[args.family])}); "
+              f"instale-a ou use outra --family")
+        return 2
+    if args.headlines:
+        with open(args.headlines, encoding='utf-8') as f:
+            corpus = [line.strip() for line in f if line.strip()]
+        print(f"{len(corpus)} manchetes de {args.headlines}")
+    else:
+        corpus = SYNTHETIC_HEADLINES
+        print(f"{len(corpus)} manchetes sintéticas (use --headlines para manchetes reais)")
+    headlines = [title.upper() for title in corpus]
+    print(f"{args.template}: caixa {max_width}x{canvas_height}px, fonte {args.family} até {max_size}px")
+
+    overflow = 0
+    for title in headlines:
+        font, lines, line_height = main.fit_title_font(title, args.family, max_width, canvas_height,
+                                                       max_size, line_spacing=line_spacing)
+        too_tall = len(lines) * line_height > canvas_height
+        overflow += too_tall
+        print(f"{len(title):4d} chars  {getattr(font, 'size', '?'):>3}px  {len(lines)} linhas"
+              f"{'  ESTOURO' if too_tall else ''}")
+
+    timings = {}
+    for name, fit in (('passo a passo', lambda t: _legacy_fit_title(t, args.family, max_width, canvas_height,
+                                                                    max_size, line_spacing)),
+                      ('fit_title_font', lambda t: main.fit_title_font(t, args.family, max_width, canvas_height,
+                                                                       max_size, line_spacing=line_spacing))):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for title in headlines:
+                fit(title)
+        timings[name] = (time.perf_counter() - start) / (args.repeat * len(headlines)) * 1000
+        print(f"{name:16s} {timings[name]:7.3f} ms/título")
+    print(f"{'':16s} {timings['passo a passo'] / timings['fit_title_font']:.1f}x")
+    return 1 if overflow else 0
+
+
+def _decode_worker(mode: str, source: str, repeat: int, queue) -> None:
+    """Decode + fit a photo to the reels video area in a fresh process (peak RSS per mode)"""
+    with main.Image.open(source) as img:
+        size = main._compute_reels_video_box(1080, 1920, img.width, img.height)[:2]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with main.Image.open(source) as img:
+            if mode == 'full':
+                # Caminho antigo: decodifica tudo e faz um único LANCZOS
+                photo = img.convert('RGB').resize(size, main.Image.LANCZOS)
+            else:
+                photo = main.load_image_scaled(img, size).resize(size, main.Image.LANCZOS)
+    queue.put({
+        'ms': (time.perf_counter() - start) / repeat * 1000,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'pixels': np.asarray(photo),
+    })
+
+
+def run_decode(args) -> int:
+    """Photo decode for reels: full decode + LANCZOS vs draft/reduce + LANCZOS"""
+    ctx = multiprocessing.get_context('spawn')
+    with main.Image.open(args.source) as img:
+        print(f"{args.source}: {img.width}x{img.height} {img.format}")
+    results = {}
+    for mode in ('full', 'scaled'):
+        queue = ctx.Queue()
+        worker = ctx.Process(target=_decode_worker, args=(mode, args.source, args.repeat, queue))
+        worker.start()
+        results[mode] = queue.get()
+        worker.join()
+        print(f"{mode:7s} {results[mode]['ms']:8.1f} ms  pico RSS {results[mode]['peak_rss_mb']:7.1f} MB")
+    score = _psnr(results['full']['pixels'], results['scaled']['pixels'])
+    print(f"{results['full']['ms'] / results['scaled']['ms']:.1f}x mais rápido, PSNR {score:.2f} dB")
+    return 0 if score >= 35.0 else 1
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    parity = sub.add_parser('parity', help="Compara as engines ffmpeg e MoviePy")
+    parity.add_argument('source')
+    parity.add_argument('--template', default='reels_modelo_1', choices=list(main.LOCAL_REELS_TEMPLATES))
+    parity.add_argument('--title', default=DEFAULT_TITLE)
+    parity.add_argument('--samples', type=int, default=5)
+    parity.add_argument('--min-psnr', type=float, default=35.0)
+    parity.set_defaults(func=run_parity)
+
+    composite = sub.add_parser('composite', help="Micro-benchmark do compositor de frames")
+    composite.add_argument('source')
+    composite.add_argument('--template', default='reels_modelo_1', choices=list(main.LOCAL_REELS_TEMPLATES))
+    composite.add_argument('--title', default=DEFAULT_TITLE)
+    composite.add_argument('--frames', type=int, default=150)
+    composite.set_defaults(func=run_composite)
+
+    segments = sub.add_parser('segments', help="Tempo do render em segmentos paralelos")
+    segments.add_argument('source')
+    segments.add_argument('--template', default='reels_modelo_1', choices=list(main.LOCAL_REELS_TEMPLATES))
+    segments.add_argument('--title', default=DEFAULT_TITLE)
+    segments.add_argument('--counts', type=int, nargs='+', default=[1, 2, 4])
+    segments.add_argument('--profile', default='standard', choices=list(main.ENCODING_PROFILES))
+    segments.set_defaults(func=run_segments)
+
+    frames = sub.add_parser('frames', help="Custo da escolha do melhor frame (miniaturas)")
+    frames.add_argument('sources', nargs='+')
+    frames.add_argument('--repeat', type=int, default=5)
+    frames.set_defaults(func=run_frames)
+
+    truncate = sub.add_parser('truncate', help="Corte de títulos longos (fit_text)")
+    truncate.add_argument('--lengths', type=int, nargs='+', default=[80, 140, 200, 300])
+    truncate.add_argument('--repeat', type=int, default=50)
+    truncate.add_argument('--font-size', type=int, default=64)
+    truncate.add_argument('--max-width', type=int, default=960)
+    truncate.set_defaults(func=run_truncate)
+
+    autofit = sub.add_parser('autofit', help="Ajuste automático do tamanho do título (manchetes)")
+    autofit.add_argument('--template', default='reels_modelo_1', choices=list(main.LOCAL_REELS_TEMPLATES))
+    autofit.add_argument('--family', default='reels_title', choices=list(main.FONT_FAMILIES))
+    autofit.add_argument('--repeat', type=int, default=20)
+    autofit.add_argument('--headlines', help="Arquivo de manchetes, uma por linha (padrão: corpus sintético)")
+    autofit.set_defaults(func=run_autofit)
+
+    decode = sub.add_parser('decode', help="Decodificação de fotos grandes (draft/reduce)")
+    decode.add_argument('source')
+    decode.add_argument('--repeat', type=int, default=3)
+    decode.set_defaults(func=run_decode)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -6,14 +6,28 @@ if not hasattr(PIL.Image, 'ANTIALIAS'):
 from flask import Flask, request, jsonify, render_template_string, send_from_directory
 from flask_cors import CORS
 import requests
+import hashlib
+import io
 import json
+import multiprocessing
 import os
 import re
+import shutil
+import subprocess
+import tempfile
+import threading
 import time
+import unicodedata
+import uuid
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
 import logging
 from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,7 +44,38 @@ class Config:
     GROQ_API_URL = 'https://api.groq.com/openai/v1/chat/completions'
     UPLOAD_FOLDER = os.path.abspath('uploads')
     MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+    # Limite de pixels por imagem decodificada (proteção contra "decompression bomb");
+    # cobre fotos de celular de 48-50 MP
+    MAX_IMAGE_PIXELS = int(os.environ.get('MAX_IMAGE_PIXELS', str(64_000_000)))
     ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'mp4', 'mov'}
+    RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', '0'))  # 0 = núcleos físicos
+    RENDER_QUEUE_SIZE = int(os.environ.get('RENDER_QUEUE_SIZE', '8'))  # jobs aguardando além dos workers
+    RENDER_RETRY_AFTER = 30  # segundos sugeridos no 429 quando a fila está cheia
+    # 'generate_all': chamadas ao Placid feitas em paralelo (só I/O; renders locais vão para o pool)
+    FANOUT_WORKERS = int(os.environ.get('FANOUT_WORKERS', '6'))
+    # 'auto': copia o áudio original quando já é compatível com MP4; 'reencode': sempre AAC novo
+    REELS_AUDIO_MODE = os.environ.get('REELS_AUDIO_MODE', 'auto')
+    MP4_PASSTHROUGH_AUDIO_CODECS = {'aac'}
+    # 'faststart': moov no início (prévia começa sem baixar tudo); 'fragmented': fMP4
+    # reproduzível enquanto ainda está sendo gravado
+    REELS_MP4_MODE = os.environ.get('REELS_MP4_MODE', 'faststart')
+    # Segmentos paralelos por render na engine ffmpeg: '1' desliga, 'auto' = um por CPU
+    # para fontes com pelo menos REELS_SEGMENT_MIN_SOURCE segundos
+    REELS_SEGMENTS = os.environ.get('REELS_SEGMENTS', '1')
+    REELS_SEGMENT_MIN_SOURCE = 30
+    # Frame usado como miniatura de vídeos: 'best' (melhor de vários candidatos) ou
+    # 'fixed' (1s, o comportamento antigo; use VIDEO_FRAME_MODE=fixed para mantê-lo)
+    VIDEO_FRAME_MODE = os.environ.get('VIDEO_FRAME_MODE', 'best')
+    RENDER_JOB_TTL = 60 * 60  # 1h: jobs finalizados são descartados depois disso
+    # Cache de renders locais (mesma mídia + título + template + perfil = mesmo arquivo)
+    RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+    RENDER_CACHE_INDEX = os.path.join(UPLOAD_FOLDER, '.render_cache.json')
+    # Overlays de título prontos em memória, por processo (bytes de pixels)
+    TITLE_OVERLAY_CACHE_MAX_BYTES = int(os.environ.get('TITLE_OVERLAY_CACHE_MAX_BYTES', str(64 * 1024 ** 2)))
+
+# Imagens acima do limite falham já no Image.open (por padrão o Pillow só avisaria até 2x)
+Image.MAX_IMAGE_PIXELS = Config.MAX_IMAGE_PIXELS
+warnings.simplefilter('error', Image.DecompressionBombWarning)
 
 try:
     # MoviePy is optional; used for extracting frames from videos for reels
@@ -45,6 +90,12 @@ except Exception as e:
     logger.error(f"Traceback: {traceback.format_exc()}")
     mpe = None
 
+try:
+    # imageio-ffmpeg ships the ffmpeg binary used by MoviePy and the ffmpeg render engine
+    import imageio_ffmpeg
+except ImportError:
+    imageio_ffmpeg = None
+
 # Templates configuration
 PLACID_TEMPLATES = {
     'stories_2': {
@@ -107,12 +158,15 @@ PLACID_TEMPLATES = {
 
 # SUBSTITUA esta parte no seu main.py (linha ~100-150):
 
+# render_engine: 'ffmpeg' (filtergraph único, sem frames no Python) ou 'moviepy'.
+# Se a engine ffmpeg falhar, o MoviePy é usado como fallback.
 LOCAL_REELS_TEMPLATES = {
     'reels_modelo_1': {
         'name': 'Reels - Modelo 1',
         'description': 'Template Tribuna Hoje com título superior',
         'type': 'reels',
         'dimensions': {'width': 1080, 'height': 1920},
+        'render_engine': 'ffmpeg',
         'style': {
             'title_position': 'top',
             'title_background': True,
@@ -121,6 +175,7 @@ LOCAL_REELS_TEMPLATES = {
             'background_pattern': 'subtle_waves',   # ondinhas fraquinhas
             'title_font_size': 48,
             'title_padding': 80,
+            'title_max_lines': 4,                   # acima disso a fonte do título diminui
             'brand_text': 'TRIBUNAHOJE.com',
             'brand_font_size': 32,
             'brand_position': 'top_center',
@@ -139,6 +194,7 @@ LOCAL_REELS_TEMPLATES = {
         'description': 'Template Tribuna Hoje com título inferior',
         'type': 'reels',
         'dimensions': {'width': 1080, 'height': 1920},
+        'render_engine': 'ffmpeg',
         'style': {
             'title_position': 'bottom',
             'title_background': True,
@@ -147,6 +203,7 @@ LOCAL_REELS_TEMPLATES = {
             'background_pattern': 'subtle_waves',   # ondinhas fraquinhas
             'title_font_size': 48,
             'title_padding': 80,
+            'title_max_lines': 4,                   # acima disso a fonte do título diminui
             'brand_text': 'TRIBUNAHOJE.com',
             'brand_font_size': 32,
             'brand_position': 'top_center',
@@ -162,6 +219,54 @@ LOCAL_REELS_TEMPLATES = {
     }
 }
 
+# Imagens geradas localmente (sem Placid): foto ou frame do vídeo com faixa de título.
+# image_format é o padrão do template; o payload 'imageFormat' sobrescreve.
+LOCAL_IMAGE_TEMPLATES = {
+    'reels_image': {
+        'name': 'Reels - Imagem',
+        'description': 'Capa vertical com título sobre a foto (ou frame do vídeo)',
+        'type': 'reels',
+        'dimensions': {'width': 1080, 'height': 1920},
+        'image_format': 'jpeg'
+    }
+}
+
+# Área vertical reservada ao vídeo nos reels locais (o título fica acima dela)
+REELS_VIDEO_AREA_TOP = 400
+REELS_VIDEO_AREA_BOTTOM = 1520
+# Fotos viram reels com esta duração (segundos) e taxa de quadros
+REELS_STILL_DURATION = 5
+REELS_STILL_FPS = 30
+# Render em segmentos paralelos (engine ffmpeg): duração mínima de cada trecho (s)
+REELS_SEGMENT_MIN_LENGTH = 4
+# Escolha do melhor frame: quantos keyframes avaliar e em que resolução (cinza)
+FRAME_SCORE_SAMPLES = 12
+FRAME_SCORE_SIZE = (160, 160)
+
+# Perfis de codificação x264 dos reels (payload 'profile').
+# 'auto' usa a qualidade do 'standard' e divide os núcleos disponíveis entre os
+# renders em andamento; com poucos threads por render cai para um preset mais rápido.
+# 'preview' é o rascunho para conferir layout/título: metade da resolução e só os
+# primeiros segundos; depois a ação 'finalize_reels' refaz o render completo.
+ENCODING_PROFILES = {
+    'draft': {'preset': 'ultrafast', 'crf': 30, 'maxrate': '2M', 'bufsize': '4M', 'threads': 2},
+    'standard': {'preset': 'medium', 'crf': 23, 'maxrate': '8M', 'bufsize': '16M', 'threads': 2},
+    'archive': {'preset': 'slow', 'crf': 18, 'maxrate': None, 'bufsize': None, 'threads': 4},
+    'auto': {'preset': 'medium', 'crf': 23, 'maxrate': '8M', 'bufsize': '16M', 'threads': 'auto'},
+    'preview': {'preset': 'ultrafast', 'crf': 30, 'maxrate': '1M', 'bufsize': '2M', 'threads': 2,
+                'scale': 0.5, 'max_duration': 5},
+}
+DEFAULT_ENCODING_PROFILE = 'auto'
+
+# Formatos de saída do template 'reels_image' (payload 'imageFormat'). PNG sem
+# perdas com compressão rápida; JPEG/WebP com perdas, arquivos menores no /uploads
+# e para o Placid buscar. subsampling=0 mantém as bordas do texto nítidas no JPEG.
+IMAGE_OUTPUT_FORMATS = {
+    'png': {'format': 'PNG', 'extension': 'png', 'params': {'compress_level': 1}},
+    'jpeg': {'format': 'JPEG', 'extension': 'jpg', 'params': {'quality': 90, 'subsampling': 0}},
+    'webp': {'format': 'WEBP', 'extension': 'webp', 'params': {'quality': 85, 'method': 2}},
+}
+
 # AI Prompts
 AI_PROMPTS = {
     'legendas': """Gerador de Legendas Jornalísticas para Instagram
@@ -294,6 +399,53 @@ Retorne apenas a versão final da notícia modelada (título + texto)."""
 }
 
 # Utility functions
+def physical_core_count() -> int:
+    """Number of physical CPU cores (Linux /proc/cpuinfo), falling back to os.cpu_count()"""
+    try:
+        cores = set()
+        physical_id = core_id = None
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                key = key.strip()
+                if key == 'physical id':
+                    physical_id = value.strip()
+                elif key == 'core id':
+                    core_id = value.strip()
+                elif not key and core_id is not None:
+                    cores.add((physical_id, core_id))
+                    physical_id = core_id = None
+        if core_id is not None:
+            cores.add((physical_id, core_id))
+        if cores:
+            return len(cores)
+    except OSError:
+        pass
+    return os.cpu_count() or 1
+
+def available_cpu_count() -> int:
+    """CPUs this process may run on (respects affinity/cpusets)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+def resolve_encoding_profile(name: Optional[str], concurrent_renders: int = 1) -> Dict[str, Any]:
+    """
+    Concrete x264 settings for a named profile. For 'auto', threads are the
+    available cores divided by the renders running at the same time.
+    """
+    name = name or DEFAULT_ENCODING_PROFILE
+    if name not in ENCODING_PROFILES:
+        logger.warning(f"Perfil de codificação desconhecido: {name}, usando {DEFAULT_ENCODING_PROFILE}")
+        name = DEFAULT_ENCODING_PROFILE
+    encoding = dict(ENCODING_PROFILES[name], profile=name)
+    if encoding['threads'] == 'auto':
+        encoding['threads'] = max(1, available_cpu_count() // max(1, concurrent_renders))
+        if encoding['threads'] < 2:
+            encoding['preset'] = 'faster'
+    return encoding
+
 def ensure_upload_directory() -> None:
     """Ensure upload directory exists"""
     if not os.path.exists(Config.UPLOAD_FOLDER):
@@ -306,61 +458,291 @@ def is_allowed_file(filename: str) -> bool:
     return True
 
 def generate_filename(prefix: str, extension: str) -> str:
-    """Generate unique filename with timestamp"""
+    """Generate unique filename with timestamp (plus a short random suffix for concurrent renders)"""
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"{prefix}_{timestamp}.{extension}"
+    return f"{prefix}_{timestamp}_{uuid.uuid4().hex[:6]}.{extension}"
+
+def build_public_url(filename: str, url_root: Optional[str] = None) -> str:
+    """Build the public /uploads URL for a file. Pass url_root outside a request context."""
+    return f"{url_root or request.url_root}uploads/{filename}"
 
 def is_video_extension(ext: str) -> bool:
     return ext.lower() in {"mp4", "mov", "mkv", "webm", "avi"}
 
-def extract_image_from_video(video_path: str, prefix: str = "frame") -> Optional[str]:
+def is_animated_image(path: str) -> bool:
+    """True for multi-frame images (animated GIF/WebP/PNG), which render as video"""
+    try:
+        with Image.open(path) as img:
+            return bool(getattr(img, 'is_animated', False))
+    except Exception:
+        return False
+
+# Registro de fontes: cada família tenta seus arquivos em ordem uma única vez
+# por processo; as FreeTypeFont carregadas ficam em cache por (família, tamanho).
+FONT_FAMILIES = {
+    'reels_title': ['Oswald-Bold.ttf', 'arialbd.ttf'],
+    'overlay': ['arial.ttf', 'DejaVuSans-Bold.ttf'],
+}
+_font_paths: Dict[str, Optional[str]] = {}
+_font_cache: Dict[Tuple[str, int], ImageFont.ImageFont] = {}
+_font_lock = threading.Lock()
+
+def resolve_font_path(family: str) -> Optional[str]:
+    """First loadable font file of a family (None = Pillow default font), resolved once"""
+    with _font_lock:
+        if family in _font_paths:
+            return _font_paths[family]
+        chosen = None
+        for candidate in FONT_FAMILIES[family]:
+            try:
+                # truetype também procura nas pastas de fontes do sistema
+                chosen = ImageFont.truetype(candidate, 10).path
+                break
+            except Exception:
+                continue
+        _font_paths[family] = chosen
+    if chosen:
+        logger.info(f"🔤 Fonte '{family}': {chosen}")
+    else:
+        logger.warning(f"⚠️ Fonte '{family}': nenhum de {FONT_FAMILIES[family]} disponível, usando fonte padrão")
+    return chosen
+
+def get_font(family: str, size: int) -> ImageFont.ImageFont:
+    """Cached font of a family at a size (see FONT_FAMILIES)"""
+    key = (family, size)
+    font = _font_cache.get(key)
+    if font is None:
+        path = resolve_font_path(family)
+        font = ImageFont.truetype(path, size) if path else ImageFont.load_default()
+        with _font_lock:
+            font = _font_cache.setdefault(key, font)
+    return font
+
+# Avanço horizontal de cada glifo, por fonte: a soma aproxima a largura do texto
+# sem medir a string inteira a cada tentativa (kerning é conferido no final)
+_glyph_advance_cache: Dict[Tuple[Any, ...], Dict[str, float]] = {}
+
+def _font_cache_key(font: ImageFont.ImageFont) -> Tuple[Any, ...]:
+    if isinstance(font, ImageFont.FreeTypeFont):
+        return (font.path, font.size, font.layout_engine)
+    return ('id', id(font))
+
+def text_width(font: ImageFont.ImageFont, text: str) -> float:
+    """Rendered width of text in pixels (same as ImageDraw.textlength)"""
+    if hasattr(font, 'getlength'):
+        return font.getlength(text)
+    bbox = font.getbbox(text)
+    return bbox[2] - bbox[0]
+
+def _glyph_prefix_widths(font: ImageFont.ImageFont, text: str) -> np.ndarray:
+    """Approximate width of every prefix text[:i] from cached per-glyph advances"""
+    advances = _glyph_advance_cache.setdefault(_font_cache_key(font), {})
+    widths = np.empty(len(text) + 1, dtype=np.float64)
+    widths[0] = 0.0
+    total = 0.0
+    for i, char in enumerate(text, 1):
+        advance = advances.get(char)
+        if advance is None:
+            advance = advances[char] = text_width(font, char)
+        total += advance
+        widths[i] = total
+    return widths
+
+def fit_text(text: str, font: ImageFont.ImageFont, max_width: float, ellipsis: str = "…") -> str:
+    """
+    Longest prefix of text that fits max_width, cut on a word boundary when
+    possible and ending in ellipsis. Binary search over cached glyph advances,
+    then an exact measurement (kerning) that backs off if needed.
+    """
+    if not text or text_width(font, text) <= max_width:
+        return text
+    budget = max_width - text_width(font, ellipsis)
+    if budget <= 0:
+        return ""
+    prefix_widths = _glyph_prefix_widths(font, text)
+    end = int(np.searchsorted(prefix_widths, budget, side='right')) - 1
+
+    while end > 0:
+        cut = text.rfind(' ', 0, end + 1)
+        candidate = text[:cut if cut > 0 else end].rstrip()
+        if candidate and text_width(font, candidate + ellipsis) <= max_width:
+            return candidate + ellipsis
+        # Kerning deixou mais largo que a estimativa: recua um caractere
+        end = (cut if cut > 0 else end) - 1
+    return ""
+
+# Largura (avanço) de cada palavra já medida, por fonte
+_word_width_cache: Dict[Tuple[Any, ...], Dict[str, float]] = {}
+WORD_WIDTH_CACHE_SIZE = 20000  # palavras por fonte antes de recomeçar o cache
+
+def _ink_width(font: ImageFont.ImageFont, text: str) -> float:
+    """Width of the text's bounding box (what the wrapping rules compare)"""
+    bbox = font.getbbox(text)
+    return bbox[2] - bbox[0]
+
+def wrap_text_lines(text: str, font: ImageFont.ImageFont, max_width: float) -> list:
+    """
+    Greedy word wrap: a word joins the line while the line's bounding box fits
+    max_width; a word too long for any line gets a line of its own.
+    Each word and the space are measured once per font and line widths are
+    accumulated; only estimates within a slack band of max_width (bearings,
+    kerning) are measured exactly, so the breaks match measuring every
+    candidate line.
+    """
+    words = text.split()
+    if not words:
+        return []
+    widths = _word_width_cache.setdefault(_font_cache_key(font), {})
+    if len(widths) > WORD_WIDTH_CACHE_SIZE:
+        widths.clear()
+    for word in words:
+        if word not in widths:
+            widths[word] = text_width(font, word)
+    space = widths.get(' ')
+    if space is None:
+        space = widths[' '] = text_width(font, ' ')
+    slack = 0.3 * getattr(font, 'size', 0) or _ink_width(font, 'M')
+
+    lines = []
+    current = []
+    current_width = 0.0
+    for word in words:
+        estimate = current_width + (space if current else 0.0) + widths[word]
+        if estimate <= max_width - slack:
+            fits = True
+        elif estimate > max_width + slack:
+            fits = False
+        else:
+            fits = _ink_width(font, ' '.join(current + [word])) <= max_width
+        if fits:
+            current.append(word)
+            current_width = estimate
+        elif current:
+            lines.append(' '.join(current))
+            current = [word]
+            current_width = widths[word]
+        else:
+            # Palavra muito longa, adiciona mesmo assim
+            lines.append(word)
+    if current:
+        lines.append(' '.join(current))
+    return lines
+
+TITLE_MIN_FONT_SIZE = 28  # abaixo disso o título fica ilegível no celular
+TITLE_MAX_LINES = 4  # padrão do estilo 'title_max_lines' (faixa de título Tribuna Hoje)
+
+def fit_title_font(text: str, family: str, max_width: float, max_height: float, max_size: int,
+                   min_size: int = TITLE_MIN_FONT_SIZE, line_spacing: float = 1.0,
+                   line_gap: int = 0) -> Tuple[ImageFont.ImageFont, list, int]:
+    """
+    Largest font size in [min_size, max_size] whose wrapped text fits the box
+    (every line within max_width, len(lines) * line_height within max_height),
+    found by binary search over sizes. Word widths are cached per font size by
+    wrap_text_lines, so refits only measure words not seen at that size.
+    Returns (font, lines, line_height); at min_size the text may still overflow.
+    """
+    def layout(size: int) -> Tuple[ImageFont.ImageFont, list, int, bool]:
+        font = get_font(family, size)
+        lines = wrap_text_lines(text, font, max_width)
+        line_height = int(round(size * line_spacing)) + line_gap
+        fits = (len(lines) * line_height <= max_height and
+                all(_ink_width(font, line) <= max_width for line in lines if ' ' not in line))
+        return font, lines, line_height, fits
+
+    best = layout(max_size)
+    if best[3] or max_size <= min_size:
+        return best[:3]
+    low, high = min_size, max_size - 1
+    best = None
+    while low <= high:
+        size = (low + high) // 2
+        candidate = layout(size)
+        if candidate[3]:
+            best = candidate
+            low = size + 1
+        else:
+            high = size - 1
+    return (best or layout(min_size))[:3]
+
+def warm_fonts() -> Dict[str, Optional[str]]:
+    """Resolve every font family up front; returns family -> chosen file (None = default)"""
+    return {family: resolve_font_path(family) for family in FONT_FAMILIES}
+
+def load_image_scaled(source: Any, target_size: Tuple[int, int]) -> Image.Image:
+    """
+    RGB image decoded/shrunk cheaply to no less than target_size (width, height);
+    the caller does the final high-quality resize. JPEGs are decoded at a reduced
+    DCT scale (draft, 1/2 to 1/8) and anything still 2x or more too big is shrunk
+    with an integer reduce(). source is a path or an Image not loaded yet.
+    """
+    if isinstance(source, str):
+        with Image.open(source) as image:
+            return load_image_scaled(image, target_size)
+    target_w, target_h = max(1, target_size[0]), max(1, target_size[1])
+    if source.format == 'JPEG':
+        source.draft('RGB', (target_w, target_h))
+    image = source.convert('RGB')
+    factor = min(image.width // target_w, image.height // target_h)
+    if factor >= 2:
+        image = image.reduce(factor)
+    return image
+
+def save_output_image(image: Image.Image, prefix: str, image_format: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Encode image into UPLOAD_FOLDER in one of IMAGE_OUTPUT_FORMATS.
+    Returns (filepath, info) with info = {imageFormat, bytes, encodeMs}.
+    """
+    spec = IMAGE_OUTPUT_FORMATS[image_format]
+    if spec['format'] == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    out_path = os.path.join(Config.UPLOAD_FOLDER, generate_filename(prefix, spec['extension']))
+    ensure_upload_directory()
+    start = time.perf_counter()
+    image.save(out_path, format=spec['format'], **spec['params'])
+    info = {
+        'imageFormat': image_format,
+        'bytes': os.path.getsize(out_path),
+        'encodeMs': round((time.perf_counter() - start) * 1000, 1),
+    }
+    logger.info(f"🖼️ {os.path.basename(out_path)}: {info['bytes']} bytes em {info['encodeMs']} ms")
+    return out_path, info
+
+def extract_image_from_video(video_path: str, prefix: str = "frame", mode: Optional[str] = None) -> Optional[str]:
     """Extract a representative frame from a video and save as PNG. Returns image filepath or None."""
     try:
-        if mpe is None:
-            logger.error("MoviePy não está disponível - verifique instalação")
+        image = representative_video_frame(video_path, mode)
+        if image is None:
             return None
-        clip = mpe.VideoFileClip(video_path)
-        duration = max(clip.duration or 0, 0)
-        # Choose frame at 1s or middle if shorter
-        t = 1.0 if duration >= 2.0 else max(duration / 2.0, 0.0)
-        frame = clip.get_frame(t)
-        image = Image.fromarray(frame)
-        filename = generate_filename(prefix, "png")
-        out_path = os.path.join(Config.UPLOAD_FOLDER, filename)
-        ensure_upload_directory()
-        image.save(out_path, format="PNG")
-        try:
-            clip.close()
-        except Exception:
-            pass
+        out_path, _ = save_output_image(image, prefix, 'png')
         return out_path
     except Exception as e:
         logger.error(f"Failed to extract frame from video: {type(e).__name__}: {e}")
         return None
 
-def generate_local_reels_image(source_media_path: str, title_text: str, template_key: str) -> Optional[Tuple[str, str]]:
+def generate_local_reels_image(source_media_path: str, title_text: str, template_key: str,
+                               url_root: Optional[str] = None,
+                               image_format: Optional[str] = None) -> Optional[Tuple[str, str, Dict[str, Any]]]:
     """
-    Create a vertical 1080x1920 PNG for reels using the provided media (image or video frame) and title.
-    Returns (filepath, public_url) or None.
+    Create a vertical 1080x1920 image for reels using the provided media (image or video frame) and title.
+    image_format defaults to the template's (LOCAL_IMAGE_TEMPLATES), else JPEG.
+    Returns (filepath, public_url, info) or None; info as in save_output_image.
     """
     try:
-        # If source is video, extract frame
+        # If source is video, grab a frame in memory (no intermediate PNG)
         ext = os.path.splitext(source_media_path)[1].lower().lstrip('.')
         if is_video_extension(ext):
-            frame_path = extract_image_from_video(source_media_path, prefix="reels_frame")
-            if not frame_path:
+            source_image = representative_video_frame(source_media_path)
+            if source_image is None:
                 return None
-            base_image_path = frame_path
         else:
-            base_image_path = source_media_path
+            source_image = Image.open(source_media_path)
 
         # Canvas setup
         width, height = 1080, 1920
         canvas = Image.new("RGB", (width, height), color=(0, 0, 0))
 
         # Load source image
-        with Image.open(base_image_path) as src:
-            src = src.convert("RGB")
+        with source_image as src:
             # Fit source to canvas while maintaining aspect ratio
             src_ratio = src.width / src.height
             canvas_ratio = width / height
@@ -372,6 +754,8 @@ def generate_local_reels_image(source_media_path: str, title_text: str, template
                 # source is taller -> fit height
                 new_height = height
                 new_width = int(new_height * src_ratio)
+            # Decode near the target scale (JPEG draft + integer reduce), then LANCZOS
+            src = load_image_scaled(src, (new_width, new_height))
             resized = src.resize((new_width, new_height), Image.LANCZOS)
             # Paste centered
             x = (width - new_width) // 2
@@ -385,29 +769,10 @@ def generate_local_reels_image(source_media_path: str, title_text: str, template
         draw.rectangle([(0, 0), (width, band_height)], fill=overlay_color)
 
         # Load font (fallback to default if no TTF available)
-        font = None
-        try:
-            # Try a common font if available on system
-            font = ImageFont.truetype("arial.ttf", 64)
-        except Exception:
-            try:
-                font = ImageFont.truetype("DejaVuSans-Bold.ttf", 64)
-            except Exception:
-                font = ImageFont.load_default()
-
-        # Title text wrap simple: truncate if too long
-        text = title_text or ""
-        max_width_px = width - 120
-        if hasattr(draw, 'textlength'):
-            while text and draw.textlength(text, font=font) > max_width_px:
-                text = text[:-1]
-        else:
-            # Fallback approximate using bbox
-            while text:
-                bbox = draw.textbbox((0, 0), text, font=font)
-                if bbox[2] - bbox[0] <= max_width_px:
-                    break
-                text = text[:-1]
+        font = get_font('overlay', 64)
+
+        # Title: truncate if too long (word boundary + ellipsis)
+        text = fit_text(title_text or "", font, width - 120)
 
         # Centered title
         bbox = draw.textbbox((0, 0), text, font=font)
@@ -421,39 +786,80 @@ def generate_local_reels_image(source_media_path: str, title_text: str, template
         draw.text((text_x, text_y), text, font=font, fill=(255,255,255,230))
 
         # Save result
-        out_filename = generate_filename(template_key, "png")
-        out_path = os.path.join(Config.UPLOAD_FOLDER, out_filename)
-        ensure_upload_directory()
-        canvas.save(out_path, format="PNG")
-        public_url = f"{request.url_root}uploads/{out_filename}"
-        return out_path, public_url
+        image_format = image_format or LOCAL_IMAGE_TEMPLATES.get(template_key, {}).get('image_format', 'jpeg')
+        out_path, info = save_output_image(canvas, template_key, image_format)
+        public_url = build_public_url(os.path.basename(out_path), url_root)
+        return out_path, public_url, info
     except Exception as e:
         logger.error(f"Failed to generate local reels image: {type(e).__name__}: {e}")
         return None
 
+# Cache LRU de overlays de título já renderizados, por processo. A mesma manchete
+# costuma ser renderizada várias vezes (modelo 1 e 2, rascunho e final, refação),
+# então o RGBA pronto é reaproveitado. Os valores são compartilhados: quem os
+# recebe não deve alterá-los (colar/recortar cria imagens novas).
+_title_overlay_cache: 'OrderedDict[Tuple[str, str, str], Any]' = OrderedDict()
+_title_overlay_cache_bytes = 0
+_title_overlay_cache_lock = threading.Lock()
+TITLE_OVERLAY_CACHE_STATS = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+def _overlay_nbytes(value: Any) -> int:
+    """Pixel bytes held by a cached overlay (an image or a tuple containing one)"""
+    items = value if isinstance(value, tuple) else (value,)
+    return sum(item.width * item.height * len(item.getbands()) for item in items if isinstance(item, Image.Image))
+
+def cached_title_overlay(title_text: str, template_key: str, style: Dict[str, Any],
+                         build: Callable[[str], Any]) -> Any:
+    """
+    Overlay for (normalized title, template, style hash), built with
+    build(normalized_title) on a miss. None results are not cached.
+    Evicts least recently used overlays beyond TITLE_OVERLAY_CACHE_MAX_BYTES.
+    """
+    global _title_overlay_cache_bytes
+    text = normalize_title(title_text)
+    style_hash = hashlib.sha1(json.dumps(style, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    key = (text, template_key, style_hash)
+    with _title_overlay_cache_lock:
+        value = _title_overlay_cache.get(key)
+        if value is not None:
+            _title_overlay_cache.move_to_end(key)
+            TITLE_OVERLAY_CACHE_STATS['hits'] += 1
+            return value
+        TITLE_OVERLAY_CACHE_STATS['misses'] += 1
+
+    value = build(text)
+    if value is None:
+        return None
+    size = _overlay_nbytes(value)
+    if size > Config.TITLE_OVERLAY_CACHE_MAX_BYTES:
+        return value
+    with _title_overlay_cache_lock:
+        if key not in _title_overlay_cache:
+            _title_overlay_cache[key] = value
+            _title_overlay_cache_bytes += size
+        while _title_overlay_cache_bytes > Config.TITLE_OVERLAY_CACHE_MAX_BYTES:
+            _, evicted = _title_overlay_cache.popitem(last=False)
+            _title_overlay_cache_bytes -= _overlay_nbytes(evicted)
+            TITLE_OVERLAY_CACHE_STATS['evictions'] += 1
+    return value
+
+def title_overlay_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and size of this process's title overlay cache"""
+    with _title_overlay_cache_lock:
+        return dict(TITLE_OVERLAY_CACHE_STATS, entries=len(_title_overlay_cache),
+                    bytes=_title_overlay_cache_bytes, maxBytes=Config.TITLE_OVERLAY_CACHE_MAX_BYTES)
+
 def _build_title_overlay_image(width: int, band_height: int, title_text: str) -> Image.Image:
+    return cached_title_overlay(title_text, 'overlay_band', {'width': width, 'band_height': band_height},
+                                lambda text: _render_title_overlay_image(width, band_height, text))
+
+def _render_title_overlay_image(width: int, band_height: int, title_text: str) -> Image.Image:
     canvas = Image.new("RGBA", (width, band_height), (0, 0, 0, 0))
     draw = ImageDraw.Draw(canvas, 'RGBA')
     draw.rectangle([(0, 0), (width, band_height)], fill=(0, 0, 0, 140))
     # Font
-    try:
-        font = ImageFont.truetype("arial.ttf", 64)
-    except Exception:
-        try:
-            font = ImageFont.truetype("DejaVuSans-Bold.ttf", 64)
-        except Exception:
-            font = ImageFont.load_default()
-    text = title_text or ""
-    max_width_px = width - 120
-    if hasattr(draw, 'textlength'):
-        while text and draw.textlength(text, font=font) > max_width_px:
-            text = text[:-1]
-    else:
-        while text:
-            bbox = draw.textbbox((0, 0), text, font=font)
-            if bbox[2] - bbox[0] <= max_width_px:
-                break
-            text = text[:-1]
+    font = get_font('overlay', 64)
+    text = fit_text(title_text or "", font, width - 120)
     bbox = draw.textbbox((0, 0), text, font=font)
     text_w = bbox[2] - bbox[0]
     text_h = bbox[3] - bbox[1]
@@ -470,34 +876,30 @@ def _create_title_overlay_for_template(width: int, height: int, title_text: str,
     """
     if not title_text:
         return None
-    
+    return cached_title_overlay(title_text, 'tribuna_hoje', dict(style, width=width, height=height),
+                                lambda text: _render_title_overlay_for_template(width, height, text, style))
+
+def _render_title_overlay_for_template(width: int, height: int, title_text: str, style: dict) -> Optional[Image.Image]:
     try:
         # Carrega fonte
         font_size = style.get('title_font_size', 48)
         brand_font_size = style.get('brand_font_size', 32)
         
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-            brand_font = ImageFont.truetype("arial.ttf", brand_font_size)
-        except Exception:
-            try:
-                font = ImageFont.truetype("DejaVuSans-Bold.ttf", font_size)
-                brand_font = ImageFont.truetype("DejaVuSans-Bold.ttf", brand_font_size)
-            except Exception:
-                font = ImageFont.load_default()
-                brand_font = ImageFont.load_default()
+        font = get_font('overlay', font_size)
+        brand_font = get_font('overlay', brand_font_size)
         
         # Calcula dimensões
         text = title_text.strip().upper()  # Tribuna Hoje usa maiúsculas
         if not text:
             return None
         
-        # Quebra texto em múltiplas linhas se necessário
+        # Quebra texto em múltiplas linhas; reduz a fonte se passar do limite de linhas
         max_width = width - (style.get('title_padding', 80) * 2)
-        lines = _wrap_text(text, font, max_width)
+        max_text_height = style.get('title_max_lines', TITLE_MAX_LINES) * (font_size + 15)
+        font, lines, line_height = fit_title_font(text, 'overlay', max_width, max_text_height,
+                                                  font_size, line_gap=15)
         
         # Calcula altura da área do título
-        line_height = font_size + 15
         text_height = len(lines) * line_height
         brand_height = brand_font_size + 10
         total_content_height = text_height + brand_height + 30  # espaço entre elementos
@@ -548,63 +950,826 @@ def _wrap_text(text: str, font: ImageFont.ImageFont, max_width: int) -> list:
     """
     Quebra texto em múltiplas linhas para caber na largura especificada.
     """
-    words = text.split()
-    lines = []
-    current_line = []
-    
-    for word in words:
-        test_line = ' '.join(current_line + [word])
-        bbox = font.getbbox(test_line) if hasattr(font, 'getbbox') else font.getsize(test_line)
-        text_width = bbox[2] - bbox[0] if hasattr(font, 'getbbox') else bbox[0]
-        
-        if text_width <= max_width:
-            current_line.append(word)
+    return wrap_text_lines(text, font, max_width)
+
+def get_ffmpeg_exe() -> str:
+    """Path to the ffmpeg binary (bundled by imageio-ffmpeg, else the system one)"""
+    if imageio_ffmpeg is not None:
+        try:
+            return imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception as e:
+            logger.warning(f"imageio-ffmpeg sem binário utilizável: {e}")
+    return 'ffmpeg'
+
+def _run_ffmpeg(args: list, input_bytes: Optional[bytes] = None) -> bool:
+    """Run ffmpeg with the given arguments. Returns True on success."""
+    cmd = [get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-y'] + args
+    try:
+        result = subprocess.run(
+            cmd,
+            input=input_bytes,
+            stdin=None if input_bytes is not None else subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        logger.error(f"Não foi possível executar ffmpeg: {e}")
+        return False
+    if result.returncode != 0:
+        logger.error(f"ffmpeg falhou ({result.returncode}): {result.stderr.decode(errors='replace')[-2000:]}")
+        return False
+    return True
+
+def probe_media(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read stream info from `ffmpeg -i` (ffprobe is not bundled with imageio-ffmpeg).
+    Returns width/height (already rotated, as ffmpeg decodes them), duration, fps,
+    audio_codec (None when there is no audio) or None if there is no video stream.
+    """
+    try:
+        result = subprocess.run(
+            [get_ffmpeg_exe(), '-hide_banner', '-i', path],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        logger.error(f"Não foi possível executar ffmpeg: {e}")
+        return None
+    output = result.stderr.decode(errors='replace')
+
+    video = re.search(r'Stream #\d+:\d+.*?: Video: .*?\b(\d{2,5})x(\d{2,5})\b', output)
+    if not video:
+        return None
+    width, height = int(video.group(1)), int(video.group(2))
+
+    rotation = re.search(r'rotate\s*:\s*(-?\d+)', output) or \
+        re.search(r'rotation of (-?[\d.]+) degrees', output)
+    if rotation and int(abs(float(rotation.group(1)))) % 180 == 90:
+        width, height = height, width
+
+    duration = None
+    match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', output)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    fps = None
+    video_line = output[video.start():].split('\n', 1)[0]
+    match = re.search(r'([\d.]+) fps', video_line) or re.search(r'([\d.]+) tbr', video_line)
+    if match:
+        fps = float(match.group(1))
+
+    match = re.search(r'Stream #\d+:\d+.*?: Audio: (\w+)', output)
+    return {
+        'width': width,
+        'height': height,
+        'duration': duration,
+        'fps': fps,
+        'audio_codec': match.group(1) if match else None,
+    }
+
+def _grab_frame_at(video_path: str, t: float) -> Tuple[Optional[Image.Image], Optional[float]]:
+    """One input-seeked ffmpeg decode of the frame at t, piped as BMP. Returns (image, duration)."""
+    try:
+        result = subprocess.run(
+            [get_ffmpeg_exe(), '-hide_banner', '-ss', f"{t:.3f}", '-i', video_path,
+             '-map', '0:v:0', '-frames:v', '1', '-c:v', 'bmp', '-f', 'image2pipe', '-'],
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.error(f"Não foi possível executar ffmpeg: {e}")
+        return None, None
+    match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', result.stderr.decode(errors='replace'))
+    duration = int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3)) if match else None
+    if not result.stdout:
+        return None, duration
+    image = Image.open(io.BytesIO(result.stdout))
+    image.load()
+    return image, duration
+
+def grab_video_frame(video_path: str, t: Optional[float] = None) -> Optional[Image.Image]:
+    """
+    Decode one video frame straight into memory, without a MoviePy reader or a
+    temporary file. Default t: 1s, or the middle of clips shorter than 2s.
+    """
+    image, duration = _grab_frame_at(video_path, 1.0 if t is None else t)
+    if t is None and duration is not None and duration < 2.0:
+        # Clipe curto: segunda busca, no meio (a duração só é conhecida agora)
+        image, _ = _grab_frame_at(video_path, max(duration / 2.0, 0.0))
+    if image is None:
+        logger.error(f"Nenhum frame decodificado de {video_path}")
+    return image
+
+def score_frames(frames: np.ndarray) -> np.ndarray:
+    """
+    Score a (K, H, W) stack of grayscale frames, higher is better: sharpness
+    (Laplacian variance, relative to the sharpest candidate), exposure (closeness
+    of the mean to mid-grey) and the share of non-black pixels. Mostly black
+    frames (fades) score zero.
+    """
+    gray = frames.astype(np.float32)
+    laplacian = (4 * gray[:, 1:-1, 1:-1] - gray[:, :-2, 1:-1] - gray[:, 2:, 1:-1]
+                 - gray[:, 1:-1, :-2] - gray[:, 1:-1, 2:])
+    sharpness = laplacian.var(axis=(1, 2))
+    sharpness /= max(float(sharpness.max()), 1e-6)
+    exposure = 1.0 - np.abs(gray.mean(axis=(1, 2)) / 255.0 - 0.5) * 2
+    non_black = (gray > 16).mean(axis=(1, 2))
+    score = 0.5 * sharpness + 0.3 * exposure + 0.2 * non_black
+    return np.where(non_black >= 0.5, score, 0.0)
+
+def _sample_score_frames(video_path: str, interval: float, samples: int,
+                         keyframes_only: bool) -> Tuple[list, Optional[np.ndarray]]:
+    """
+    One ffmpeg pass selecting frames at least `interval` seconds apart, scaled to
+    FRAME_SCORE_SIZE in grayscale. Returns (timestamps, (K, H, W) frames or None).
+    """
+    score_w, score_h = FRAME_SCORE_SIZE
+    skip = ['-skip_frame', 'nokey'] if keyframes_only else []
+    try:
+        result = subprocess.run(
+            [get_ffmpeg_exe(), '-hide_banner', *skip, '-i', video_path, '-map', '0:v:0',
+             '-vf', f"select=isnan(prev_selected_t)+gte(t-prev_selected_t\\,{interval:.3f}),"
+                    f"scale={score_w}:{score_h},showinfo",
+             '-vsync', '0', '-frames:v', str(samples), '-f', 'rawvideo', '-pix_fmt', 'gray', '-'],
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=120
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.error(f"Não foi possível executar ffmpeg: {e}")
+        return [], None
+    times = [float(t) for t in re.findall(r'pts_time:\s*(-?[\d.]+)', result.stderr.decode(errors='replace'))]
+    count = min(len(times), len(result.stdout) // (score_w * score_h))
+    if count == 0:
+        return [], None
+    frames = np.frombuffer(result.stdout, dtype=np.uint8, count=count * score_w * score_h)
+    return times[:count], frames.reshape(count, score_h, score_w)
+
+def best_video_frame(video_path: str, samples: int = FRAME_SCORE_SAMPLES) -> Optional[Image.Image]:
+    """
+    Pick the best of up to `samples` evenly spaced candidates: one ffmpeg pass
+    decodes only keyframes (-skip_frame nokey) at FRAME_SCORE_SIZE in grayscale,
+    NumPy scores them (score_frames) and the winner is grabbed at full resolution.
+    Clips with sparse keyframes (short clips keep x264's 250-frame GOP) are
+    sampled from a full low-res decode instead, evenly spaced in time.
+    """
+    info = probe_media(video_path)
+    if not info or not info['duration']:
+        return grab_video_frame(video_path)
+    interval = info['duration'] / samples
+    source = 'keyframes'
+    times, frames = _sample_score_frames(video_path, interval, samples, keyframes_only=True)
+    if len(times) < samples // 2:
+        # Poucos keyframes: decodifica o clipe inteiro (baixa resolução) e amostra no tempo
+        source = 'frames'
+        times, frames = _sample_score_frames(video_path, interval, samples, keyframes_only=False)
+    if len(times) < 2:
+        logger.info(f"Vídeo com um único frame utilizável: {video_path}")
+        return grab_video_frame(video_path, times[0] if times else None)
+    scores = score_frames(frames)
+    best = int(scores.argmax())
+    logger.info(f"🖼️ Melhor frame em {times[best]:.2f}s (score {scores[best]:.3f} de {len(times)} {source})")
+    return grab_video_frame(video_path, times[best])
+
+def representative_video_frame(video_path: str, mode: Optional[str] = None) -> Optional[Image.Image]:
+    """Thumbnail frame for a video: best keyframe or the fixed 1s frame (Config.VIDEO_FRAME_MODE)"""
+    if (mode or Config.VIDEO_FRAME_MODE) == 'best':
+        return best_video_frame(video_path)
+    return grab_video_frame(video_path)
+
+def _reels_audio_codec_args(audio_codec: Optional[str]) -> list:
+    """Audio codec args for reels output: stream copy when MP4-compatible, else AAC"""
+    if Config.REELS_AUDIO_MODE == 'auto' and audio_codec in Config.MP4_PASSTHROUGH_AUDIO_CODECS:
+        logger.info(f"Áudio {audio_codec} copiado sem recodificar")
+        return ['-c:a', 'copy']
+    logger.info(f"Áudio {audio_codec} recodificado para AAC")
+    return ['-c:a', 'aac']
+
+def _reels_video_codec_args(fps: int, encoding: Optional[Dict[str, Any]] = None) -> list:
+    """x264 output args shared by both reels engines (see resolve_encoding_profile)"""
+    encoding = encoding or resolve_encoding_profile(None)
+    args = [
+        '-r', str(fps),
+        '-c:v', 'libx264',
+        '-preset', encoding['preset'],
+        '-crf', str(encoding['crf']),
+        '-threads', str(encoding['threads']),
+        '-pix_fmt', 'yuv420p',
+    ]
+    if encoding.get('maxrate'):
+        args += ['-maxrate', encoding['maxrate'], '-bufsize', encoding['bufsize']]
+    return args
+
+MP4_MOVFLAGS = {
+    'faststart': '+faststart',
+    'fragmented': '+frag_keyframe+empty_moov+default_base_moof',
+}
+
+def _reels_encoded_size(width: int, height: int, encoding: Optional[Dict[str, Any]] = None) -> Tuple[int, int]:
+    """Output size after the profile's 'scale' (even dimensions for yuv420p)"""
+    scale = (encoding or {}).get('scale') or 1
+    return int(width * scale) // 2 * 2, int(height * scale) // 2 * 2
+
+def _reels_max_duration(encoding: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """Duration cap (seconds) of the profile, None for a full render"""
+    return (encoding or {}).get('max_duration')
+
+def _mp4_movflags_args(mp4_mode: Optional[str] = None) -> list:
+    """Container flags for progressive playback (see Config.REELS_MP4_MODE)"""
+    return ['-movflags', MP4_MOVFLAGS.get(mp4_mode or Config.REELS_MP4_MODE, MP4_MOVFLAGS['faststart'])]
+
+def _encode_frames_ffmpeg(frames, size: Tuple[int, int], fps: int, out_path: str,
+                          audio_source: Optional[str] = None, audio_codec: Optional[str] = None,
+                          duration: Optional[float] = None, encoding: Optional[Dict[str, Any]] = None,
+                          mp4_mode: Optional[str] = None) -> bool:
+    """
+    Pipe RGB frames into an ffmpeg encoder. The audio track, if any, is mapped
+    straight from audio_source (stream copy when possible), never through Python.
+    """
+    width, height = size
+    cmd = [get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-y',
+           '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-r', str(fps),
+           '-i', 'pipe:0']
+    if audio_source:
+        cmd += ['-i', audio_source, '-map', '0:v:0', '-map', '1:a:0']
+        cmd += _reels_audio_codec_args(audio_codec)
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+    out_w, out_h = _reels_encoded_size(width, height, encoding)
+    if (out_w, out_h) != (width, height):
+        cmd += ['-vf', f"scale={out_w}:{out_h}"]
+    cmd += _reels_video_codec_args(fps, encoding) + _mp4_movflags_args(mp4_mode) + [out_path]
+
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except OSError as e:
+        logger.error(f"Não foi possível executar ffmpeg: {e}")
+        return False
+    try:
+        for frame in frames:
+            proc.stdin.write(np.ascontiguousarray(frame).data)
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+    except Exception:
+        proc.kill()
+        proc.wait()
+        raise
+    stderr = proc.stderr.read()
+    proc.wait()
+    if proc.returncode != 0:
+        logger.error(f"ffmpeg falhou ({proc.returncode}): {stderr.decode(errors='replace')[-2000:]}")
+        return False
+    return True
+
+def _reels_background_path(template_key: str) -> str:
+    """Background image for a local reels template"""
+    if template_key == 'reels_modelo_2':
+        return os.path.join(os.path.dirname(__file__), "template2.jpg")
+    return os.path.join(os.path.dirname(__file__), "template1.jpg")
+
+def _reels_output_fps(source_fps: Optional[float]) -> int:
+    """Output fps for reels: source fps clamped to 24..60 (30 for stills/unknown)"""
+    try:
+        fps = int(source_fps or 30)
+    except Exception:
+        fps = 30
+    return min(max(fps, 24), 60)
+
+def _compute_reels_video_box(width: int, height: int, src_w: int, src_h: int) -> Tuple[int, int, int, int]:
+    """
+    Posiciona o vídeo na área central do template ocupando toda a largura
+    (ou a altura disponível, se não couber). Returns (w, h, x, y).
+    """
+    # Área disponível para vídeo: deixa espaço para título
+    video_area_top = REELS_VIDEO_AREA_TOP
+    video_area_bottom = REELS_VIDEO_AREA_BOTTOM
+    video_area_height = video_area_bottom - video_area_top
+
+    # Vídeo ocupa toda a largura do template
+    video_target_width = width
+    original_aspect_ratio = src_w / src_h
+    video_target_height = int(video_target_width / original_aspect_ratio)
+
+    logger.info(f"Proporção original do vídeo: {original_aspect_ratio:.3f}")
+    logger.info(f"Dimensões calculadas para largura total: {video_target_width}x{video_target_height}")
+
+    # Verifica se a altura calculada cabe na área disponível
+    if video_target_height > video_area_height:
+        # Se não couber, ajusta pela altura disponível
+        video_target_height = video_area_height
+        video_target_width = int(video_target_height * original_aspect_ratio)
+        logger.info(f"Ajustado por altura disponível: {video_target_width}x{video_target_height}")
+
+    # Centraliza o vídeo na área disponível
+    video_x = (width - video_target_width) // 2
+    video_y = video_area_top + (video_area_height - video_target_height) // 2
+    return video_target_width, video_target_height, video_x, video_y
+
+def _build_reels_title_image(title_text: str, template_key: str, width: int) -> Optional[Tuple[Image.Image, int]]:
+    """
+    Renderiza o título do reels (RGBA transparente) com as configurações do template.
+    Returns (title_img, title_y_position) or None. O resultado vem do cache de
+    overlays e é compartilhado: não altere a imagem.
+    """
+    if not title_text:
+        return None
+    return cached_title_overlay(title_text, template_key, {'width': width},
+                                lambda text: _render_reels_title_image(text, template_key, width))
+
+def _render_reels_title_image(title_text: str, template_key: str, width: int) -> Optional[Tuple[Image.Image, int]]:
+    try:
+        video_area_top = REELS_VIDEO_AREA_TOP
+        # Configurações diferentes por template
+        if template_key == 'reels_modelo_2':
+            # MODELO 2: Texto menor, alinhado à esquerda
+            canvas_height = 250
+            font_size = 51
+            line_height = 70
+            text_align = 'left'
+            margin_left = 90
+            title_y_position = video_area_top - 7
         else:
-            if current_line:
-                lines.append(' '.join(current_line))
-                current_line = [word]
+            # MODELO 1: Texto grande, centralizado
+            canvas_height = 400
+            font_size = 50
+            line_height = 70
+            text_align = 'center'
+            margin_left = 60
+            title_y_position = video_area_top - 62
+
+        # Cria canvas
+        title_img = Image.new('RGBA', (width, canvas_height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(title_img)
+
+        # Texto em CAIXA ALTA
+        text = title_text.upper().strip()
+        max_width = width - (margin_left * 2)
+
+        # Quebra em linhas no maior tamanho (até o do template) que cabe no canvas
+        # (Oswald-Bold → arialbd → padrão, resolvida uma vez)
+        font, lines, line_height = fit_title_font(text, 'reels_title', max_width, canvas_height,
+                                                  font_size, line_spacing=line_height / font_size)
+        font_size = getattr(font, 'size', font_size)
+
+        # Desenha o texto
+        total_height = len(lines) * line_height
+        start_y = (canvas_height - total_height) // 2
+
+        for i, line in enumerate(lines):
+            bbox = draw.textbbox((0, 0), line, font=font)
+            text_width = bbox[2] - bbox[0]
+
+            # Alinhamento: esquerda ou centro
+            if text_align == 'left':
+                x = margin_left
             else:
-                # Palavra muito longa, adiciona mesmo assim
-                lines.append(word)
-    
-    if current_line:
-        lines.append(' '.join(current_line))
-    
-    return lines
+                x = (width - text_width) // 2
+
+            y = start_y + i * line_height
+
+            # Texto branco apenas
+            draw.text((x, y), line, font=font, fill=(255, 255, 255, 255))
+
+        logger.info(f"Título criado: {template_key}, align={text_align}, size={font_size}px")
+        return title_img, title_y_position
+
+    except Exception as e:
+        logger.error(f"Falha ao criar título: {e}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return None
+
+# Cache de fundos dos templates, por processo: decodificados e redimensionados
+# uma vez, invalidados quando o mtime do arquivo muda.
+_template_background_cache: Dict[Tuple[str, int, int], Tuple[float, np.ndarray]] = {}
+_template_background_lock = threading.Lock()
 
-def generate_local_reels_video(source_media_path: str, title_text: str, template_key: str) -> Optional[Tuple[str, str]]:
+def load_template_background(path: str, size: Tuple[int, int]) -> Optional[np.ndarray]:
     """
-    Gera um vídeo de reels usando template de fundo "template1".
-    Compõe: fundo fixo + vídeo centralizado + título superior.
-    O vídeo agora preenche toda a largura do template.
-    Returns (filepath, public_url) or None.
+    Template background decoded and resized to `size` as a read-only RGB array,
+    shared across jobs in this process. Returns None if the file is missing.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    key = (path, size[0], size[1])
+    with _template_background_lock:
+        cached = _template_background_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    with Image.open(path) as bg:
+        frame = np.asarray(bg.convert('RGB').resize(size, Image.LANCZOS))
+    frame.setflags(write=False)
+    with _template_background_lock:
+        _template_background_cache[key] = (mtime, frame)
+    logger.info(f"Fundo de template carregado em cache: {os.path.basename(path)} {size[0]}x{size[1]}")
+    return frame
+
+def warm_template_backgrounds() -> None:
+    """Decode every local reels template background ahead of the first job"""
+    for template_key, template in LOCAL_REELS_TEMPLATES.items():
+        size = (template['dimensions']['width'], template['dimensions']['height'])
+        try:
+            load_template_background(_reels_background_path(template_key), size)
+        except Exception as e:
+            logger.warning(f"Não foi possível pré-carregar fundo de {template_key}: {e}")
+
+def _build_reels_static_layer(template_key: str, width: int, height: int,
+                              title: Optional[Tuple[Image.Image, int]]) -> Optional[Image.Image]:
+    """
+    Achata as camadas estáticas (fundo do template + título) num único frame RGB,
+    para que cada frame do vídeo só precise colar a região do vídeo sobre ele.
+    """
+    template_bg_path = _reels_background_path(template_key)
+    # Fundo esticado para ocupar toda a tela (vem do cache do processo)
+    background = load_template_background(template_bg_path, (width, height))
+    if background is None:
+        logger.error(f"Imagem de template não encontrada: {template_bg_path}")
+        logger.error(f"Template key: {template_key}")
+        return None
+
+    logger.info(f"Usando template de fundo: {template_bg_path}")
+    frame = Image.fromarray(background)
+    if title:
+        title_img, title_y = title
+        frame.paste(title_img, (0, title_y), title_img)
+    return frame
+
+def _reels_title_overlap(title: Optional[Tuple[Image.Image, int]],
+                         video_box: Tuple[int, int, int, int]) -> Optional[Tuple[Image.Image, int, int]]:
+    """
+    Parte do título que cai sobre o vídeo (o título fica por cima dele).
+    O resto do título já está na camada estática. Returns (patch_rgba, x, y) or None.
+    """
+    if not title:
+        return None
+    title_img, title_y = title
+    ink = title_img.getchannel('A').getbbox()
+    if not ink:
+        return None
+    video_w, video_h, video_x, video_y = video_box
+    left = max(ink[0], video_x)
+    top = max(ink[1] + title_y, video_y)
+    right = min(ink[2], video_x + video_w)
+    bottom = min(ink[3] + title_y, video_y + video_h)
+    if left >= right or top >= bottom:
+        return None
+    patch = title_img.crop((left, top - title_y, right, bottom - title_y))
+    return patch, left, top
+
+class ReelsFrameCompositor:
+    """
+    Compositor de frames do layout de reels com buffers pré-alocados.
+
+    O frame de saída (camada estática) é alocado uma vez; a cada frame só a
+    região do vídeo é sobrescrita e o trecho do título sobre o vídeo é
+    reaplicado apenas nas linhas/colunas que ele ocupa. composite() devolve
+    sempre o mesmo buffer: consuma-o antes de chamar de novo.
+    O redimensionamento (Pillow LANCZOS) não escreve no buffer: quando a fonte
+    tem outro tamanho, cada frame ainda aloca uma imagem redimensionada
+    temporária antes da cópia para a região do vídeo.
+    """
+
+    def __init__(self, static_frame: np.ndarray, video_box: Tuple[int, int, int, int],
+                 overlap: Optional[Tuple[Image.Image, int, int]] = None):
+        self.output = np.array(static_frame, dtype=np.uint8, copy=True)
+        video_w, video_h, video_x, video_y = video_box
+        self._video_size = (video_w, video_h)
+        self._video_region = self.output[video_y:video_y + video_h, video_x:video_x + video_w]
+
+        self._patch_region = None
+        if overlap:
+            patch, patch_x, patch_y = overlap
+            rgba = np.asarray(patch, dtype=np.float32) / 255.0
+            alpha = rgba[:, :, 3:4]
+            self._patch_region = self.output[patch_y:patch_y + patch.height, patch_x:patch_x + patch.width]
+            self._inverse_alpha = np.ascontiguousarray(1.0 - alpha)
+            self._patch_color = np.ascontiguousarray(rgba[:, :, :3] * alpha * 255.0 + 0.5)
+            self._blend_buffer = np.empty(self._patch_region.shape, dtype=np.float32)
+
+    def composite(self, source_frame: np.ndarray) -> np.ndarray:
+        """Paste one source frame (any size, resized here) into the output buffer"""
+        video_w, video_h = self._video_size
+        if source_frame.shape[0] != video_h or source_frame.shape[1] != video_w:
+            # Aloca por frame (entrada do Pillow + imagem redimensionada); só a cópia abaixo é in-place
+            source_frame = np.asarray(Image.fromarray(source_frame[:, :, :3]).resize(self._video_size, Image.LANCZOS))
+        np.copyto(self._video_region, source_frame[:, :, :3])
+        if self._patch_region is not None:
+            np.multiply(self._patch_region, self._inverse_alpha, out=self._blend_buffer)
+            self._blend_buffer += self._patch_color
+            np.copyto(self._patch_region, self._blend_buffer, casting='unsafe')
+        return self.output
+
+def probe_keyframes(path: str) -> list:
+    """Keyframe timestamps (seconds) of the first video stream; only keyframes are decoded"""
+    try:
+        result = subprocess.run(
+            [get_ffmpeg_exe(), '-hide_banner', '-skip_frame', 'nokey', '-i', path,
+             '-map', '0:v:0', '-vf', 'showinfo', '-f', 'null', '-'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=120
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.error(f"Falha ao ler keyframes de {path}: {e}")
+        return []
+    stderr = result.stderr.decode(errors='replace')
+    return [float(t) for t in re.findall(r'pts_time:\s*(-?[\d.]+)', stderr)]
+
+def _resolve_segment_count(segments: Any, duration: Optional[float]) -> int:
+    """How many parallel segments to render: int, or 'auto' (one per CPU for long clips)"""
+    segments = segments if segments is not None else Config.REELS_SEGMENTS
+    if not duration:
+        return 1
+    if segments == 'auto':
+        if duration < Config.REELS_SEGMENT_MIN_SOURCE:
+            return 1
+        segments = available_cpu_count()
+    try:
+        count = int(segments)
+    except (TypeError, ValueError):
+        return 1
+    # Segmentos muito curtos não compensam o custo de abrir mais um ffmpeg
+    return max(1, min(count, int(duration // REELS_SEGMENT_MIN_LENGTH)))
+
+def _plan_reels_segments(duration: float, keyframes: list, count: int) -> list:
+    """Split [0, duration) into up to `count` (start, end) ranges that start on keyframes"""
+    starts = [0.0]
+    for i in range(1, count):
+        target = duration * i / count
+        nearest = min(keyframes, key=lambda t: abs(t - target), default=None)
+        if nearest is not None and starts[-1] + REELS_SEGMENT_MIN_LENGTH / 2 <= nearest < duration - REELS_SEGMENT_MIN_LENGTH / 2:
+            starts.append(nearest)
+    return list(zip(starts, starts[1:] + [duration]))
+
+def _stack_reels_layers(static_layer: Image.Image,
+                        overlap: Optional[Tuple[Image.Image, int, int]]) -> Tuple[bytes, Tuple[int, int]]:
+    """
+    Raw frame with the ffmpeg engine's fixed layers: the static layer (RGB) and,
+    when the title overlaps the video, the RGBA title patch stacked below it
+    (the filtergraph crops them apart). Returns (bytes, (width, height)).
+    """
+    if not overlap:
+        return static_layer.tobytes(), static_layer.size
+    patch = overlap[0]
+    width, height = static_layer.size
+    stacked = np.zeros((height + patch.height, width, 4), dtype=np.uint8)
+    stacked[:height, :, :3] = np.asarray(static_layer)
+    stacked[:height, :, 3] = 255
+    stacked[height:, :patch.width] = np.asarray(patch)
+    return stacked.tobytes(), (width, height + patch.height)
+
+def _render_reels_segmented(source_media_path: str, duration: float, fps: int, audio_codec: Optional[str],
+                            composite_args, layers: bytes, count: int, out_path: str,
+                            encoding: Optional[Dict[str, Any]] = None, mp4_mode: Optional[str] = None) -> bool:
+    """
+    Render the ffmpeg filtergraph in keyframe-aligned segments on parallel ffmpeg
+    processes, then concatenate them without re-encoding. The audio comes from
+    the source in one piece, so it has no gaps at segment boundaries.
+    composite_args(source_args, start_time) builds the engine's inputs + filtergraph;
+    layers is the rawvideo frame each segment reads from stdin.
+    """
+    plan = _plan_reels_segments(duration, probe_keyframes(source_media_path), count)
+    if len(plan) < 2:
+        logger.info("[ffmpeg] Sem keyframes para dividir, renderizando em um único segmento")
+        return False
+
+    encoding = encoding or resolve_encoding_profile(None)
+    # Os threads do perfil são divididos entre os segmentos simultâneos
+    segment_encoding = dict(encoding, threads=max(1, int(encoding['threads']) // len(plan)))
+    workdir = tempfile.mkdtemp(prefix='reels_segments_')
+    try:
+        jobs = []
+        for i, (start, end) in enumerate(plan):
+            segment_path = os.path.join(workdir, f"segment_{i:03d}.mp4")
+            # O seek zera os timestamps no início do trecho; start_time desloca a grade
+            # do fps para cair nos mesmos instantes da fonte que o render de uma vez
+            first_frame = round(start * fps)
+            args = composite_args(['-ss', f"{start:.6f}", '-i', source_media_path], first_frame / fps - start)
+            if i < len(plan) - 1:
+                # Contagem exata de frames: a soma dos segmentos fecha com a timeline completa
+                args += ['-frames:v', str(round(end * fps) - first_frame)]
+            args += _reels_video_codec_args(fps, segment_encoding) + [segment_path]
+            jobs.append((segment_path, args))
+
+        logger.info(f"[ffmpeg] Renderizando {len(plan)} segmentos em paralelo: "
+                    f"{', '.join(f'{start:.2f}-{end:.2f}s' for start, end in plan)}")
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="segment") as executor:
+            results = list(executor.map(lambda job: _run_ffmpeg(job[1], input_bytes=layers), jobs))
+        if not all(results):
+            logger.error("[ffmpeg] Falha em um dos segmentos")
+            return False
+
+        list_path = os.path.join(workdir, 'segments.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for segment_path, _ in jobs:
+                f.write(f"file '{segment_path}'\n")
+        args = ['-f', 'concat', '-safe', '0', '-i', list_path]
+        if audio_codec:
+            args += ['-i', source_media_path, '-map', '0:v:0', '-map', '1:a:0']
+            args += _reels_audio_codec_args(audio_codec)
+        # O arquivo final só existe depois do concat: grava num temporário (dotfile, fora
+        # do /uploads) e renomeia, assim a prévia fMP4 não é anunciada para um arquivo
+        # que não cresce progressivamente
+        partial_path = os.path.join(os.path.dirname(out_path), f".{os.path.basename(out_path)}.part")
+        args += ['-c:v', 'copy'] + _mp4_movflags_args(mp4_mode) + ['-f', 'mp4', partial_path]
+        logger.info(f"[ffmpeg] Concatenando segmentos em: {out_path}")
+        if not _run_ffmpeg(args):
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return False
+        os.replace(partial_path, out_path)
+        return True
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def _render_reels_ffmpeg(source_media_path: str, title_text: str, template_key: str, out_path: str,
+                        encoding: Optional[Dict[str, Any]] = None, mp4_mode: Optional[str] = None,
+                        segments: Any = None) -> bool:
+    """
+    Engine ffmpeg: expressa o layout do reels (fundo + vídeo redimensionado + título)
+    como um único filtergraph, sem passar os frames pelo Python.
+    segments (int ou 'auto', padrão Config.REELS_SEGMENTS) divide vídeos longos em
+    trechos renderizados em paralelo (ver _render_reels_segmented).
+    """
+    template = LOCAL_REELS_TEMPLATES[template_key]
+    width, height = template['dimensions']['width'], template['dimensions']['height']
+
+    ext = os.path.splitext(source_media_path)[1].lower().lstrip('.')
+    is_still = False
+    if is_video_extension(ext) or is_animated_image(source_media_path):
+        info = probe_media(source_media_path)
+        if not info:
+            logger.error(f"ffmpeg não encontrou stream de vídeo em {source_media_path}")
+            return False
+        src_w, src_h = info['width'], info['height']
+        fps = _reels_output_fps(info['fps'])
+        audio_codec = info['audio_codec']
+        duration = info['duration']
+    else:
+        try:
+            with Image.open(source_media_path) as img:
+                src_w, src_h = img.size
+        except Exception as e:
+            logger.error(f"Falha ao abrir mídia: {type(e).__name__}: {e}")
+            return False
+        is_still = True
+        fps = REELS_STILL_FPS
+        audio_codec = None
+        duration = None
+
+    video_box = _compute_reels_video_box(width, height, src_w, src_h)
+    video_w, video_h, video_x, video_y = video_box
+    logger.info(f"[ffmpeg] Vídeo {video_w}x{video_h} em ({video_x}, {video_y}), {fps}fps")
+
+    title = _build_reels_title_image(title_text, template_key, width)
+    static_layer = _build_reels_static_layer(template_key, width, height, title)
+    if static_layer is None:
+        return False
+    overlap = _reels_title_overlap(title, video_box)
+
+    # Camadas fixas vão pelo stdin como um único frame rawvideo (nada é gravado em disco):
+    # fundo+título em cima e, se houver, o trecho do título sobre o vídeo logo abaixo
+    layers, layers_size = _stack_reels_layers(static_layer, overlap)
+    layers_w, layers_h = layers_size
+    inputs_head = ['-f', 'rawvideo', '-pix_fmt', 'rgba' if overlap else 'rgb24',
+                   '-s', f"{layers_w}x{layers_h}", '-framerate', str(fps), '-i', 'pipe:0']
+
+    max_duration = _reels_max_duration(encoding)
+    if is_still:
+        # Mesmo comportamento do MoviePy: imagem vira um clipe curto
+        still_duration = min(REELS_STILL_DURATION, max_duration or REELS_STILL_DURATION)
+        source_input = ['-loop', '1', '-framerate', str(fps), '-t', str(still_duration), '-i', source_media_path]
+    elif max_duration:
+        # Rascunho: só decodifica o trecho inicial (vídeo e áudio)
+        source_input = ['-t', str(max_duration), '-i', source_media_path]
+    else:
+        source_input = ['-i', source_media_path]
+
+    # Fundo e título já vêm achatados; só o trecho do título sobre o vídeo é reaplicado.
+    # {start_time} alinha a grade do filtro fps à timeline da fonte quando o
+    # vídeo é renderizado em segmentos (ver _render_reels_segmented)
+    if overlap:
+        patch, patch_x, patch_y = overlap
+        filtergraph = (
+            f"[0:v]split[layers_bg][layers_patch];"
+            f"[layers_bg]crop={width}:{height}:0:0,format=rgb24,loop=loop=-1:size=1:start=0[bg];"
+            f"[layers_patch]crop={patch.width}:{patch.height}:0:{height},loop=loop=-1:size=1:start=0[patch];"
+        )
+    else:
+        filtergraph = "[0:v]format=rgb24,loop=loop=-1:size=1:start=0[bg];"
+    filtergraph += (
+        f"[1:v]fps=fps={fps}:start_time={{start_time}},"
+        f"scale={video_w}:{video_h}:flags=lanczos,setsar=1,format=rgb24[vid];"
+        f"[bg][vid]overlay=x={video_x}:y={video_y}:shortest=1:format=rgb"
+    )
+    if overlap:
+        filtergraph += f"[base];[base][patch]overlay=x={patch_x}:y={patch_y}:shortest=1:format=rgb"
+    out_w, out_h = _reels_encoded_size(width, height, encoding)
+    if (out_w, out_h) != (width, height):
+        # Compõe em tamanho real (layout idêntico ao final) e só reduz na saída
+        filtergraph += f",scale={out_w}:{out_h}"
+    filtergraph += ",format=yuv420p[out]"
+
+    def composite_args(source_args: list, start_time: float = 0.0) -> list:
+        return (inputs_head + source_args +
+                ['-filter_complex', filtergraph.format(start_time=f"{start_time:.6f}"), '-map', '[out]'])
+
+    segment_count = 1 if is_still or max_duration else _resolve_segment_count(segments, duration)
+    if segment_count > 1:
+        if _render_reels_segmented(source_media_path, duration, fps, audio_codec,
+                                   composite_args, layers, segment_count, out_path,
+                                   encoding, mp4_mode):
+            return True
+        logger.warning("[ffmpeg] Render em segmentos falhou, renderizando de uma vez")
+
+    args = composite_args(source_input)
+    if audio_codec:
+        args += ['-map', '1:a:0'] + _reels_audio_codec_args(audio_codec)
+    args += _reels_video_codec_args(fps, encoding) + _mp4_movflags_args(mp4_mode) + [out_path]
+    logger.info(f"[ffmpeg] Exportando vídeo para: {out_path}")
+    return _run_ffmpeg(args, input_bytes=layers)
+
+def _render_reels_still(source_media_path: str, title_text: str, template_key: str, out_path: str,
+                        encoding: Optional[Dict[str, Any]] = None, mp4_mode: Optional[str] = None) -> bool:
+    """
+    Caminho rápido para fotos: compõe o frame final uma única vez e o codifica
+    repetido (filtro loop) com ajustes do x264 para conteúdo estático.
+    """
+    template = LOCAL_REELS_TEMPLATES[template_key]
+    width, height = template['dimensions']['width'], template['dimensions']['height']
+
+    try:
+        with Image.open(source_media_path) as img:
+            video_box = _compute_reels_video_box(width, height, img.width, img.height)
+            photo = load_image_scaled(img, video_box[:2])
+    except Exception as e:
+        logger.error(f"Falha ao abrir imagem: {type(e).__name__}: {e}")
+        return False
+
+    video_w, video_h, video_x, video_y = video_box
+    title = _build_reels_title_image(title_text, template_key, width)
+    frame = _build_reels_static_layer(template_key, width, height, title)
+    if frame is None:
+        return False
+    frame.paste(photo.resize((video_w, video_h), Image.LANCZOS), (video_x, video_y))
+    overlap = _reels_title_overlap(title, video_box)
+    if overlap:
+        patch, patch_x, patch_y = overlap
+        frame.paste(patch, (patch_x, patch_y), patch)
+
+    out_w, out_h = _reels_encoded_size(width, height, encoding)
+    if (out_w, out_h) != (width, height):
+        frame = frame.resize((out_w, out_h), Image.BILINEAR)
+    duration = min(REELS_STILL_DURATION, _reels_max_duration(encoding) or REELS_STILL_DURATION)
+    frame_count = int(duration * REELS_STILL_FPS)
+    args = [
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{out_w}x{out_h}",
+        '-framerate', str(REELS_STILL_FPS), '-i', 'pipe:0',
+        # Converte para yuv420p uma vez, antes de repetir o frame
+        '-vf', f"format=yuv420p,loop=loop={frame_count - 1}:size=1:start=0",
+        '-frames:v', str(frame_count),
+    ]
+    args += _reels_video_codec_args(REELS_STILL_FPS, encoding) + _mp4_movflags_args(mp4_mode)
+    # Um único GOP; os P-frames repetidos são só blocos "skip", então a busca de
+    # movimento mais barata não muda a qualidade, só o tempo de codificação.
+    # Em fMP4 cada fragmento começa num keyframe: GOP de 1s para a prévia parcial
+    # não ficar presa num fragmento único gravado só no final
+    gop = REELS_STILL_FPS if mp4_mode == 'fragmented' else frame_count
+    args += [
+        '-tune', 'stillimage',
+        '-g', str(gop),
+        '-x264-params', 'me=dia:subme=1:ref=1:bframes=0',
+        out_path
+    ]
+    logger.info(f"[still] Exportando imagem como vídeo de {duration}s: {out_path}")
+    return _run_ffmpeg(args, input_bytes=frame.tobytes())
+
+def _render_reels_moviepy(source_media_path: str, title_text: str, template_key: str, out_path: str,
+                         encoding: Optional[Dict[str, Any]] = None, mp4_mode: Optional[str] = None) -> bool:
+    """
+    Engine MoviePy: o MoviePy só decodifica; fundo + título são achatados uma vez
+    e cada frame passa pelo ReelsFrameCompositor antes de ir para o ffmpeg.
     """
     if mpe is None:
         logger.error("MoviePy não está disponível - verifique instalação")
         logger.error("Tente: pip install moviepy imageio imageio-ffmpeg")
-        return None
-    
+        return False
+
     # Teste de componentes MoviePy
     logger.info("Testando importações do MoviePy...")
     try:
-        from moviepy.editor import VideoFileClip, ImageClip, ColorClip, CompositeVideoClip, TextClip
+        from moviepy.editor import VideoFileClip, ImageClip
         logger.info("Importações básicas OK")
     except Exception as e:
         logger.error(f"Falha nas importações: {e}")
-        return None
-    
-    # Verifica se o template existe
-    if template_key not in LOCAL_REELS_TEMPLATES:
-        logger.error(f"Template de reels não encontrado: {template_key}")
-        return None
-    
+        return False
+
     template = LOCAL_REELS_TEMPLATES[template_key]
-    
+
     try:
         width, height = template['dimensions']['width'], template['dimensions']['height']
         logger.info(f"Gerando reels com template: {template['name']}")
         logger.info(f"Dimensões do template final: {width}x{height}")
-        
+
         # Carrega o vídeo ou converte imagem para vídeo
         clip = None
         logger.info(f"Verificando arquivo: {os.path.exists(source_media_path)}")
@@ -619,235 +1784,142 @@ def generate_local_reels_video(source_media_path: str, title_text: str, template
             logger.info("Convertendo imagem para vídeo")
             try:
                 with Image.open(source_media_path) as img:
-                    img = img.convert('RGB')
-                    temp_img = generate_filename("reels_from_image", "png")
-                    temp_path = os.path.join(Config.UPLOAD_FOLDER, temp_img)
-                    ensure_upload_directory()
-                    img.save(temp_path, format='PNG')
-                image_clip = mpe.ImageClip(temp_path).set_duration(5)
-                clip = image_clip.set_fps(30)
+                    # Já no tamanho da área do vídeo: o compositor não redimensiona a foto inteira
+                    photo_w, photo_h = _compute_reels_video_box(width, height, img.width, img.height)[:2]
+                    photo = np.asarray(load_image_scaled(img, (photo_w, photo_h))
+                                       .resize((photo_w, photo_h), Image.LANCZOS))
+                # Direto da memória, sem PNG intermediário em uploads/
+                image_clip = mpe.ImageClip(photo).set_duration(REELS_STILL_DURATION)
+                clip = image_clip.set_fps(REELS_STILL_FPS)
                 logger.info("Imagem convertida para vídeo com sucesso")
             except Exception as e2:
                 logger.error(f"Falha ao abrir mídia: {type(e2).__name__}: {e2}")
-                return None
+                return False
+
+        max_duration = _reels_max_duration(encoding)
+        if max_duration and clip.duration > max_duration:
+            logger.info(f"Rascunho: usando só os primeiros {max_duration}s")
+            clip = clip.subclip(0, max_duration)
+
+        # Vídeo preenchendo toda a largura do template (redimensionado pelo compositor)
+        video_box = _compute_reels_video_box(width, height, clip.w, clip.h)
+        video_target_width, video_target_height, video_x, video_y = video_box
 
-        # Carrega a imagem de fundo baseada no template selecionado
-        if template_key == 'reels_modelo_2':
-            template_bg_path = os.path.join(os.path.dirname(__file__), "template2.jpg")
-        else:
-            template_bg_path = os.path.join(os.path.dirname(__file__), "template1.jpg")
-            
-        if not os.path.exists(template_bg_path):
-            logger.error(f"Imagem de template não encontrada: {template_bg_path}")
-            logger.error(f"Template key: {template_key}")
-            return None
-        
-        logger.info(f"Usando template de fundo: {template_bg_path}")
-        
-        # Cria o fundo usando a imagem template esticando para ocupar toda a tela
-        bg = mpe.ImageClip(template_bg_path).set_duration(clip.duration).resize((width, height))
-        logger.info(f"Fundo esticado para ocupar toda a tela: {width}x{height}")
-        
-        # NOVA LÓGICA: Vídeo preenchendo toda a largura do template
-        # Área disponível para vídeo: deixa espaço para título
-        video_area_top = 400  # Espaço para título
-        video_area_bottom = 1520  # Espaço na parte inferior
-        video_area_height = video_area_bottom - video_area_top
-        
-        # MUDANÇA PRINCIPAL: Vídeo ocupa toda a largura do template
-        video_target_width = width  # Largura total do template (1080px)
-        
-        # Calcula altura proporcional baseada na largura total
-        original_aspect_ratio = clip.w / clip.h
-        video_target_height = int(video_target_width / original_aspect_ratio)
-        
-        logger.info(f"Proporção original do vídeo: {original_aspect_ratio:.3f}")
-        logger.info(f"Dimensões calculadas para largura total: {video_target_width}x{video_target_height}")
-        
-        # Verifica se a altura calculada cabe na área disponível
-        if video_target_height > video_area_height:
-            # Se não couber, ajusta pela altura disponível
-            video_target_height = video_area_height
-            video_target_width = int(video_target_height * original_aspect_ratio)
-            logger.info(f"Ajustado por altura disponível: {video_target_width}x{video_target_height}")
-        
-        # Redimensiona o vídeo para as dimensões calculadas
-        resized_clip = clip.resize(newsize=(video_target_width, video_target_height))
-        
-        # Centraliza o vídeo na área disponível
-        video_x = (width - video_target_width) // 2  # Centralizado horizontalmente
-        video_y = video_area_top + (video_area_height - video_target_height) // 2  # Centralizado verticalmente na área
-        positioned_video = resized_clip.set_position((video_x, video_y))
-        
         logger.info(f"Vídeo redimensionado para: {video_target_width}x{video_target_height}")
         logger.info(f"Posição do vídeo: ({video_x}, {video_y})")
         logger.info(f"Proporção do vídeo final: {video_target_width/video_target_height:.3f}")
         logger.info(f"Proporção do template final: {width/height:.3f}")
 
-# Cria o título usando PIL
-        title_clip = None
-        if title_text:
-            try:
-                # Configurações diferentes por template
-                if template_key == 'reels_modelo_2':
-                    # MODELO 2: Texto menor, alinhado à esquerda
-                    canvas_height = 250
-                    font_size = 51
-                    line_height = 70
-                    text_align = 'left'
-                    margin_left = 90
-                    title_y_position = video_area_top - 7
-                else:
-                    # MODELO 1: Texto grande, centralizado
-                    canvas_height = 400
-                    font_size = 50
-                    line_height = 70
-                    text_align = 'center'
-                    margin_left = 60
-                    title_y_position = video_area_top - 62
-                
-                # Cria canvas
-                title_img = Image.new('RGBA', (width, canvas_height), (0, 0, 0, 0))
-                draw = ImageDraw.Draw(title_img)
-                
-                # Carrega fonte
-                font = None
-                try:
-                    font = ImageFont.truetype("Oswald-Bold.ttf", font_size)
-                    logger.info(f"Fonte Oswald-Bold.ttf carregada: {font_size}px")
-                except Exception:
-                    try:
-                        font = ImageFont.truetype("arialbd.ttf", font_size)
-                    except Exception:
-                        font = ImageFont.load_default()
-                
-                # Texto em CAIXA ALTA
-                text = title_text.upper().strip()
-                max_width = width - (margin_left * 2)
-                
-                # Quebra o texto em múltiplas linhas
-                words = text.split()
-                lines = []
-                current_line = []
-                
-                for word in words:
-                    test_line = ' '.join(current_line + [word])
-                    bbox = draw.textbbox((0, 0), test_line, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    
-                    if text_width <= max_width:
-                        current_line.append(word)
-                    else:
-                        if current_line:
-                            lines.append(' '.join(current_line))
-                            current_line = [word]
-                        else:
-                            lines.append(word)
-                
-                if current_line:
-                    lines.append(' '.join(current_line))
-                
-                # Desenha o texto
-                total_height = len(lines) * line_height
-                start_y = (canvas_height - total_height) // 2
-                
-                for i, line in enumerate(lines):
-                    bbox = draw.textbbox((0, 0), line, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    
-                    # Alinhamento: esquerda ou centro
-                    if text_align == 'left':
-                        x = margin_left
-                    else:
-                        x = (width - text_width) // 2
-                    
-                    y = start_y + i * line_height
-                    
-                    # Texto branco apenas
-                    draw.text((x, y), line, font=font, fill=(255, 255, 255, 255))
-                
-                # Salva e cria clip
-                title_filename = generate_filename("title_overlay", "png")
-                title_path = os.path.join(Config.UPLOAD_FOLDER, title_filename)
-                ensure_upload_directory()
-                title_img.save(title_path, format='PNG')
-                
-                title_clip = mpe.ImageClip(title_path).set_duration(clip.duration).set_position((0, title_y_position))
-                logger.info(f"Título criado: {template_key}, align={text_align}, size={font_size}px")
-                
-            except Exception as e:
-                logger.error(f"Falha ao criar título: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
-
+        # Camada estática: fundo esticado para a tela toda + título (PIL), achatados uma vez
+        title = _build_reels_title_image(title_text, template_key, width)
+        static_layer = _build_reels_static_layer(template_key, width, height, title)
+        if static_layer is None:
+            return False
+        logger.info(f"Camada estática achatada: {width}x{height}")
 
-        # Composição final: fundo + vídeo + título
-        clips_to_compose = [bg, positioned_video]
-        if title_clip:
-            clips_to_compose.append(title_clip)
-        
-        composed = mpe.CompositeVideoClip(clips_to_compose)
+        # Composição final: camada estática + vídeo (+ trecho do título sobre o vídeo)
+        compositor = ReelsFrameCompositor(
+            np.asarray(static_layer), video_box, _reels_title_overlap(title, video_box)
+        )
 
-        # Preserva áudio original se existir
-        try:
-            if hasattr(clip, 'audio') and clip.audio is not None:
-                composed = composed.set_audio(clip.audio)
-                logger.info("Áudio original preservado")
-        except Exception as e:
-            logger.warning(f"Não foi possível preservar áudio: {e}")
+        # Preserva áudio original se existir: o ffmpeg lê direto da fonte
+        audio_source = audio_codec = None
+        if getattr(clip, 'audio', None) is not None:
+            info = probe_media(source_media_path)
+            audio_source = source_media_path
+            audio_codec = info['audio_codec'] if info else None
+            logger.info("Áudio original preservado")
 
         # Exporta o vídeo
-        out_filename = generate_filename(template_key, "mp4")
-        out_path = os.path.join(Config.UPLOAD_FOLDER, out_filename)
-        
-        fps = None
-        try:
-            fps = int(getattr(clip, 'fps', 30) or 30)
-        except Exception:
-            fps = 30
+        fps = _reels_output_fps(getattr(clip, 'fps', 30))
 
         logger.info(f"Exportando vídeo para: {out_path}")
         try:
-            composed.write_videofile(
-                out_path,
-                fps=min(max(fps, 24), 60),
-                codec='libx264',
-                audio_codec='aac',
-                threads=2,
-                preset='medium',
-                verbose=False,
-                logger=None
+            exported = _encode_frames_ffmpeg(
+                (compositor.composite(frame) for frame in clip.iter_frames(fps=fps, dtype='uint8')),
+                (width, height), fps, out_path,
+                audio_source=audio_source,
+                audio_codec=audio_codec,
+                duration=clip.duration,
+                encoding=encoding,
+                mp4_mode=mp4_mode
             )
+            if not exported:
+                return False
             logger.info("Exportação concluída!")
         except Exception as e:
             logger.error(f"Erro na exportação: {type(e).__name__}: {e}")
             import traceback
             logger.error(f"Traceback exportação: {traceback.format_exc()}")
-            return None
+            return False
 
         # Cleanup
         try:
             if clip is not None:
                 clip.close()
-            if 'resized_clip' in locals():
-                resized_clip.close()
-            if 'composed' in locals():
-                composed.close()
-            if title_clip is not None:
-                title_clip.close()
         except Exception:
             pass
 
-        public_url = f"{request.url_root}uploads/{out_filename}"
-        logger.info(f"Reels gerado com sucesso: {public_url}")
-        return out_path, public_url
-        
+        return True
+
     except Exception as e:
         logger.error(f"Falha ao gerar vídeo local de reels: {type(e).__name__}: {e}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
+        return False
+
+def generate_local_reels_video(source_media_path: str, title_text: str, template_key: str,
+                               url_root: Optional[str] = None,
+                               encoding: Optional[Dict[str, Any]] = None,
+                               mp4_mode: Optional[str] = None,
+                               out_filename: Optional[str] = None,
+                               segments: Any = None) -> Optional[Tuple[str, str]]:
+    """
+    Gera um vídeo de reels usando template de fundo "template1".
+    Compõe: fundo fixo + vídeo centralizado + título superior.
+    O vídeo agora preenche toda a largura do template.
+    A engine vem do template ('render_engine'); se a engine ffmpeg falhar,
+    o caminho MoviePy é usado como fallback.
+    url_root é obrigatório quando chamado fora de uma requisição (jobs de renderização).
+    encoding vem de resolve_encoding_profile (padrão: DEFAULT_ENCODING_PROFILE);
+    mp4_mode escolhe faststart/fragmented (padrão: Config.REELS_MP4_MODE).
+    out_filename permite ao chamador saber o arquivo antes do fim (prévia fMP4).
+    segments: render em trechos paralelos na engine ffmpeg (int ou 'auto').
+    Returns (filepath, public_url) or None.
+    """
+    # Verifica se o template existe
+    if template_key not in LOCAL_REELS_TEMPLATES:
+        logger.error(f"Template de reels não encontrado: {template_key}")
         return None
 
+    template = LOCAL_REELS_TEMPLATES[template_key]
+    engine = template.get('render_engine', 'moviepy')
+
+    out_filename = out_filename or generate_filename(template_key, "mp4")
+    out_path = os.path.join(Config.UPLOAD_FOLDER, out_filename)
+    ensure_upload_directory()
+
+    rendered = False
+    ext = os.path.splitext(source_media_path)[1].lower().lstrip('.')
+    # Só imagens de um quadro viram still; GIF animado segue para as engines de vídeo
+    if not is_video_extension(ext) and not is_animated_image(source_media_path):
+        rendered = _render_reels_still(source_media_path, title_text, template_key, out_path, encoding, mp4_mode)
+        if not rendered:
+            logger.warning("Caminho de imagem estática falhou, tentando as engines de vídeo")
+    if not rendered and engine == 'ffmpeg':
+        rendered = _render_reels_ffmpeg(source_media_path, title_text, template_key, out_path, encoding, mp4_mode,
+                                        segments)
+        if not rendered:
+            logger.warning("Engine ffmpeg falhou, usando MoviePy como fallback")
+    if not rendered:
+        rendered = _render_reels_moviepy(source_media_path, title_text, template_key, out_path, encoding, mp4_mode)
+    if not rendered:
+        return None
+
+    public_url = build_public_url(out_filename, url_root)
+    logger.info(f"Reels gerado com sucesso ({engine}): {public_url}")
+    return out_path, public_url
+
 def call_groq_api(prompt: str, content: str, max_tokens: int = 1000) -> Optional[str]:
     """Call Groq API with error handling and retries"""
     if not Config.GROQ_API_KEY or Config.GROQ_API_KEY == 'your-api-key-here':
@@ -1078,7 +2150,7 @@ def save_uploaded_file(file, prefix: str) -> Tuple[bool, str, str]:
         logger.info("✅ File saved successfully")
         
         # Generate public URL
-        public_url = f"{request.url_root}uploads/{filename}"
+        public_url = build_public_url(filename)
         logger.info(f"🌐 Public URL: {public_url}")
         
         # Verify file exists
@@ -1178,6 +2250,322 @@ def error_response(message: str, **kwargs) -> Dict[str, Any]:
     response.update(kwargs)
     return response
 
+# Render jobs
+# Cache de renders locais endereçado por conteúdo: a chave é o sha256 da mídia
+# enviada + título normalizado + template + perfil. Os arquivos ficam em uploads/
+# e o índice em disco (JSON) guarda tamanho e último uso para o LRU por bytes.
+_render_cache_index: Optional[Dict[str, Dict[str, Any]]] = None
+_render_cache_lock = threading.Lock()
+RENDER_CACHE_STATS = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+# Digests já calculados: (caminho, tamanho, mtime_ns) -> sha256. Um upload usado
+# por vários templates ('generate_all') é lido uma vez só.
+_file_digest_cache: Dict[Tuple[str, int, int], str] = {}
+
+def file_sha256(path: str) -> str:
+    """sha256 hex digest of a file, read in 1MB chunks (memoized while unchanged)"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    cached = _file_digest_cache.get(key)
+    if cached:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    if len(_file_digest_cache) > 1000:
+        _file_digest_cache.clear()
+    _file_digest_cache[key] = digest.hexdigest()
+    return _file_digest_cache[key]
+
+def normalize_title(title: str) -> str:
+    """Title as the renderers see it: NFC, trimmed, single spaces (case is kept)"""
+    return ' '.join(unicodedata.normalize('NFC', title or '').split())
+
+def render_cache_key(source_path: str, title: str, template_key: str, profile: str, *variant: str) -> str:
+    """Cache key for a local render; variant distinguishes outputs (e.g. MP4 mode)"""
+    parts = [file_sha256(source_path), normalize_title(title), template_key, profile or '', *variant]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+def _load_render_cache_index() -> Dict[str, Dict[str, Any]]:
+    """Index loaded lazily from disk. Caller must hold the lock."""
+    global _render_cache_index
+    if _render_cache_index is None:
+        try:
+            with open(Config.RENDER_CACHE_INDEX, 'r', encoding='utf-8') as f:
+                _render_cache_index = json.load(f)
+            logger.info(f"🗃️ Render cache index loaded ({len(_render_cache_index)} entries)")
+        except FileNotFoundError:
+            _render_cache_index = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Render cache index unreadable, starting empty: {e}")
+            _render_cache_index = {}
+    return _render_cache_index
+
+def _save_render_cache_index() -> None:
+    """Write the index atomically. Caller must hold the lock."""
+    ensure_upload_directory()
+    tmp_path = f"{Config.RENDER_CACHE_INDEX}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_render_cache_index, f)
+        os.replace(tmp_path, Config.RENDER_CACHE_INDEX)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not save render cache index: {e}")
+
+def _evict_render_cache(index: Dict[str, Dict[str, Any]], keep: str) -> None:
+    """Drop least recently used entries (and files) until under the byte budget"""
+    total = sum(entry['size'] for entry in index.values())
+    for key, entry in sorted(index.items(), key=lambda item: item[1]['lastUsed']):
+        if total <= Config.RENDER_CACHE_MAX_BYTES:
+            break
+        if key == keep:
+            continue
+        try:
+            os.remove(os.path.join(Config.UPLOAD_FOLDER, entry['filename']))
+        except OSError:
+            pass
+        total -= entry['size']
+        del index[key]
+        RENDER_CACHE_STATS['evictions'] += 1
+        logger.info(f"🗑️ Render cache evicted {entry['filename']}")
+
+def render_cache_get(key: str) -> Optional[str]:
+    """Filename (in UPLOAD_FOLDER) of a cached render, or None on a miss"""
+    with _render_cache_lock:
+        index = _load_render_cache_index()
+        entry = index.get(key)
+        if entry and not os.path.exists(os.path.join(Config.UPLOAD_FOLDER, entry['filename'])):
+            # Arquivo removido por fora do cache
+            del index[key]
+            entry = None
+        if not entry:
+            RENDER_CACHE_STATS['misses'] += 1
+            return None
+        RENDER_CACHE_STATS['hits'] += 1
+        entry['lastUsed'] = time.time()
+        _save_render_cache_index()
+        return entry['filename']
+
+def render_cache_put(key: str, out_path: str) -> None:
+    """Record a finished render under key and evict down to RENDER_CACHE_MAX_BYTES"""
+    try:
+        size = os.path.getsize(out_path)
+    except OSError:
+        return
+    if size > Config.RENDER_CACHE_MAX_BYTES:
+        return
+    with _render_cache_lock:
+        index = _load_render_cache_index()
+        now = time.time()
+        index[key] = {'filename': os.path.basename(out_path), 'size': size, 'createdAt': now, 'lastUsed': now}
+        _evict_render_cache(index, keep=key)
+        _save_render_cache_index()
+
+def render_cache_stats() -> Dict[str, Any]:
+    with _render_cache_lock:
+        index = _load_render_cache_index()
+        return dict(RENDER_CACHE_STATS, entries=len(index),
+                    bytes=sum(entry['size'] for entry in index.values()),
+                    maxBytes=Config.RENDER_CACHE_MAX_BYTES)
+
+# Renderizações locais (reels) rodam fora da thread da requisição; o cliente
+# recebe um jobId e consulta /api/job/<job_id>. O registro fica em memória,
+# o que pressupõe um único worker gunicorn (ver Dockerfile).
+# Cada job ocupa um slot (thread) que delega o trabalho pesado a um pool de
+# processos, assim a composição MoviePy/NumPy não disputa o GIL com as
+# requisições Flask. Jobs além de slots + RENDER_QUEUE_SIZE recebem 429.
+RENDER_JOBS: Dict[str, Dict[str, Any]] = {}
+# Núcleos físicos, limitados às CPUs que o container pode usar (affinity/cpuset):
+# num host de 32 núcleos com o container preso a 2 CPUs, são 2 workers
+RENDER_WORKER_COUNT = Config.RENDER_WORKERS or min(physical_core_count(), available_cpu_count())
+_render_jobs_lock = threading.Lock()
+_render_executor = ThreadPoolExecutor(max_workers=RENDER_WORKER_COUNT, thread_name_prefix="render")
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+# Single-flight: cacheKey -> job em andamento; pedidos idênticos (duplo clique,
+# retry do frontend) se anexam a esse job em vez de renderizar de novo
+_inflight_render_jobs: Dict[str, str] = {}
+
+# Estatísticas do cache de overlays de cada processo de render (pid -> último retrato)
+_title_overlay_worker_stats: Dict[int, Dict[str, Any]] = {}
+
+def _run_in_render_worker(render_fn, args: tuple, kwargs: Dict[str, Any]) -> Tuple[Any, int, Dict[str, Any]]:
+    """Worker-side wrapper: render result plus this process's title overlay cache stats"""
+    return render_fn(*args, **kwargs), os.getpid(), title_overlay_cache_stats()
+
+def title_overlay_stats_all() -> Dict[str, Any]:
+    """Title overlay cache stats summed over this process and the render workers"""
+    snapshots = [title_overlay_cache_stats()]
+    with _render_jobs_lock:
+        snapshots += list(_title_overlay_worker_stats.values())
+    totals = {field: sum(snapshot[field] for snapshot in snapshots)
+              for field in ('hits', 'misses', 'evictions', 'entries', 'bytes')}
+    lookups = totals['hits'] + totals['misses']
+    totals['hitRate'] = round(totals['hits'] / lookups, 3) if lookups else None
+    totals['processes'] = len(snapshots)
+    return totals
+
+def _init_render_worker() -> None:
+    """Render process initializer: warm per-process caches before the first job"""
+    warm_template_backgrounds()
+    warm_fonts()
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Lazily start the render process pool ('spawn' is safe with gunicorn threads)"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=RENDER_WORKER_COUNT,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_render_worker
+            )
+            logger.info(f"🏭 Render process pool started with {RENDER_WORKER_COUNT} workers")
+        return _render_pool
+
+def _reset_render_pool(broken: ProcessPoolExecutor) -> None:
+    """Discard a pool whose worker died so the next job starts a fresh one"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is broken:
+            _render_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def _prune_render_jobs() -> None:
+    """Drop finished jobs older than RENDER_JOB_TTL. Caller must hold the lock."""
+    cutoff = time.time() - Config.RENDER_JOB_TTL
+    expired = [job_id for job_id, job in RENDER_JOBS.items()
+               if job['finishedAt'] and job['finishedAt'] < cutoff]
+    for job_id in expired:
+        del RENDER_JOBS[job_id]
+
+def _finish_render_job(job_id: str, **fields) -> None:
+    """Record the final state and release the job's single-flight slot"""
+    with _render_jobs_lock:
+        job = RENDER_JOBS.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        if job['cacheKey'] and _inflight_render_jobs.get(job['cacheKey']) == job_id:
+            del _inflight_render_jobs[job['cacheKey']]
+
+def _run_render_job(job_id: str, render_fn, args: tuple, kwargs: Dict[str, Any]) -> None:
+    """Executor entry point: runs the renderer and records the outcome on the job"""
+    with _render_jobs_lock:
+        job = RENDER_JOBS[job_id]
+        job.update(status='running', startedAt=time.time())
+        if job['encodingProfile']:
+            # Threads do perfil 'auto' dependem de quantos renders estão rodando agora
+            running = sum(1 for other in RENDER_JOBS.values() if other['status'] == 'running')
+            job['encoding'] = resolve_encoding_profile(job['encodingProfile'], running)
+            kwargs = dict(kwargs, encoding=job['encoding'])
+    logger.info(f"🎬 Render job {job_id} running")
+    pool = _get_render_pool()
+    try:
+        generated, worker_pid, overlay_stats = pool.submit(_run_in_render_worker, render_fn, args, kwargs).result()
+        with _render_jobs_lock:
+            _title_overlay_worker_stats[worker_pid] = overlay_stats
+    except BrokenProcessPool as e:
+        logger.error(f"❌ Render job {job_id} lost its worker process: {e}")
+        _reset_render_pool(pool)
+        generated = None
+    except Exception as e:
+        logger.error(f"❌ Render job {job_id} crashed: {type(e).__name__}: {e}")
+        generated = None
+
+    if not generated:
+        _finish_render_job(job_id, status='failed', finishedAt=time.time(),
+                           error="Falha ao gerar reels localmente")
+        logger.error(f"❌ Render job {job_id} failed")
+        return
+
+    # Renderers return (path, url) or, for images, (path, url, info) with format/bytes/encodeMs
+    out_path, public_url = generated[:2]
+    if job['cacheKey']:
+        render_cache_put(job['cacheKey'], out_path)
+    url_field = 'videoUrl' if out_path.lower().endswith('.mp4') else 'imageUrl'
+    result = {url_field: public_url}
+    if len(generated) > 2:
+        result.update(generated[2])
+    _finish_render_job(job_id, status='done', finishedAt=time.time(), result=result)
+    logger.info(f"✅ Render job {job_id} done: {public_url}")
+
+def submit_render_job(render_fn, *args, encoding_profile: Optional[str] = None,
+                      preview_path: Optional[str] = None, preview_url: Optional[str] = None,
+                      cache_key: Optional[str] = None, **kwargs) -> Optional[str]:
+    """
+    Queue a local render (e.g. generate_local_reels_video) and return its job ID.
+    render_fn runs in a worker process, so it must be a module-level function.
+    With encoding_profile, the resolved settings are passed as `encoding` when
+    the job starts and exposed on the job. preview_path/preview_url point at an
+    output that is playable while still being written (fragmented MP4).
+    With cache_key (see render_cache_key), a cached output is returned as a job
+    that is already done, a request identical to a queued/running job gets that
+    job's ID (single-flight), and a successful render is added to the cache.
+    Returns None when all workers are busy and the wait queue is full.
+    """
+    job_id = uuid.uuid4().hex
+    cached = render_cache_get(cache_key) if cache_key else None
+    with _render_jobs_lock:
+        _prune_render_jobs()
+        inflight_id = _inflight_render_jobs.get(cache_key) if cache_key and not cached else None
+        if inflight_id:
+            RENDER_JOBS[inflight_id]['attached'] += 1
+            logger.info(f"🔗 Identical render already in flight, attaching to job {inflight_id}")
+            return inflight_id
+        active = sum(1 for job in RENDER_JOBS.values() if job['status'] in ('queued', 'running'))
+        if not cached and active >= RENDER_WORKER_COUNT + Config.RENDER_QUEUE_SIZE:
+            logger.warning(f"🚦 Render queue full ({active} active jobs), rejecting {render_fn.__name__}")
+            return None
+        RENDER_JOBS[job_id] = {
+            'id': job_id,
+            'status': 'queued',
+            'createdAt': time.time(),
+            'startedAt': None,
+            'finishedAt': None,
+            'result': None,
+            'error': None,
+            'encodingProfile': encoding_profile,
+            'encoding': None,
+            'previewPath': preview_path,
+            'previewUrl': preview_url,
+            'cacheKey': cache_key,
+            'cached': False,
+            'attached': 0,  # pedidos idênticos que reaproveitaram este job
+            # Guardado para refazer o render com outro perfil (finalize_reels)
+            'render': (render_fn, args, kwargs),
+        }
+        if cached:
+            url_field = 'videoUrl' if cached.lower().endswith('.mp4') else 'imageUrl'
+            RENDER_JOBS[job_id].update(
+                status='done', finishedAt=time.time(), cached=True,
+                result={url_field: build_public_url(cached, kwargs.get('url_root'))}
+            )
+        elif cache_key:
+            _inflight_render_jobs[cache_key] = job_id
+    if cached:
+        logger.info(f"♻️ Render job {job_id} served from cache: {cached}")
+        return job_id
+    _render_executor.submit(_run_render_job, job_id, render_fn, args, kwargs)
+    logger.info(f"📥 Render job {job_id} queued ({render_fn.__name__})")
+    return job_id
+
+def render_queue_full_response():
+    """429 response asking the client to retry once a render slot frees up"""
+    retry_after = Config.RENDER_RETRY_AFTER
+    response = jsonify(error_response(
+        "Fila de renderização cheia. Tente novamente em instantes.",
+        retryAfter=retry_after
+    ))
+    return response, 429, {'Retry-After': str(retry_after)}
+
+def get_render_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return a snapshot of a render job, or None if unknown/expired"""
+    with _render_jobs_lock:
+        job = RENDER_JOBS.get(job_id)
+        return dict(job) if job else None
+
 # Route handlers
 @app.route('/')
 def index():
@@ -1258,6 +2646,8 @@ def process_request():
         handlers = {
             'apply_watermark': handle_watermark,
             'generate_post': handle_generate_post,
+            'generate_all': handle_generate_all,
+            'finalize_reels': handle_finalize_reels,
             'generate_title_ai': handle_generate_title,
             'generate_captions_ai': handle_generate_captions,
             'rewrite_news_ai': handle_rewrite_news,
@@ -1353,6 +2743,10 @@ def handle_generate_post(payload: Dict[str, Any], request) -> jsonify:
     # Validate required fields
     template_key = payload.get('template', 'feed_1_red')
     title = payload.get('title', '')
+    encoding_profile = payload.get('profile') or DEFAULT_ENCODING_PROFILE
+    mp4_mode = payload.get('mp4Mode') or Config.REELS_MP4_MODE
+    if payload.get('preview'):
+        encoding_profile = 'preview'
     subject = payload.get('subject', '')
     credits = payload.get('credits', '')
     
@@ -1364,6 +2758,12 @@ def handle_generate_post(payload: Dict[str, Any], request) -> jsonify:
     # Check if it's a local reels template first
     if template_key in LOCAL_REELS_TEMPLATES:
         logger.info("🎬 Using local reels video compositor (no Placid)")
+        if encoding_profile not in ENCODING_PROFILES:
+            logger.error(f"❌ Unknown encoding profile: {encoding_profile}")
+            return jsonify(error_response(f"Unknown encoding profile: {encoding_profile}"))
+        if mp4_mode not in MP4_MOVFLAGS:
+            logger.error(f"❌ Unknown MP4 mode: {mp4_mode}")
+            return jsonify(error_response(f"Unknown MP4 mode: {mp4_mode}"))
         # Upload file first
         logger.info("💾 Starting file upload process for reels")
         success, filepath, public_url = save_uploaded_file(file, "post")
@@ -1373,14 +2773,23 @@ def handle_generate_post(payload: Dict[str, Any], request) -> jsonify:
             logger.error(f"❌ File upload failed: {public_url}")
             return jsonify(error_response(public_url))
         
-        generated = generate_local_reels_video(filepath, title, template_key)
-        if not generated:
-            return jsonify(error_response("Falha ao gerar reels localmente"))
-        _, public_out_url = generated
-        return jsonify(success_response(
-            "Reels gerado com sucesso!",
-            videoUrl=public_out_url
-        ))
+        return submit_reels_job(filepath, title, template_key, encoding_profile, mp4_mode, request.url_root,
+                                payload.get('segments'))
+    
+    if template_key in LOCAL_IMAGE_TEMPLATES:
+        logger.info("🖼️ Using local image compositor (no Placid)")
+        image_format = payload.get('imageFormat') or LOCAL_IMAGE_TEMPLATES[template_key]['image_format']
+        if image_format not in IMAGE_OUTPUT_FORMATS:
+            logger.error(f"❌ Unknown image format: {image_format}")
+            return jsonify(error_response(f"Unknown image format: {image_format}"))
+        success, filepath, public_url = save_uploaded_file(file, "post")
+        if not success:
+            logger.error(f"❌ File upload failed: {public_url}")
+            return jsonify(error_response(public_url))
+        response = queue_image_job(filepath, title, template_key, image_format, request.url_root)
+        if response is None:
+            return render_queue_full_response()
+        return jsonify(response)
     
     if template_key not in PLACID_TEMPLATES:
         logger.warning(f"⚠️ Template {template_key} not found, using fallback")
@@ -1406,6 +2815,12 @@ def handle_generate_post(payload: Dict[str, Any], request) -> jsonify:
         return jsonify(error_response(public_url))
     
 
+    return jsonify(create_placid_post(template_key, public_url, title, subject, credits))
+
+def create_placid_post(template_key: str, public_url: str, title: str = "",
+                       subject: str = "", credits: str = "") -> Dict[str, Any]:
+    """Create a post in Placid for an uploaded file; returns the response fields"""
+    template_info = PLACID_TEMPLATES[template_key]
     logger.info("🔧 Configuring layers for template")
     layers = configure_layers_for_template(
         template_key, template_info, public_url,
@@ -1430,19 +2845,194 @@ def handle_generate_post(payload: Dict[str, Any], request) -> jsonify:
     if result:
         if result.get('image_url'):
             logger.info("✅ Image created with direct URL")
-            return jsonify(success_response(
+            return success_response(
                 "Post generated successfully!",
                 imageUrl=result['image_url']
-            ))
+            )
         else:
             logger.info("⏳ Image processing in background")
-            return jsonify(success_response(
+            return success_response(
                 "Post processing...",
                 imageId=result.get('id')
-            ))
+            )
     else:
         logger.error("❌ Failed to create post in Placid")
-        return jsonify(error_response("Failed to create post"))
+        return error_response("Failed to create post")
+
+def submit_reels_job(filepath: str, title: str, template_key: str, encoding_profile: str,
+                     mp4_mode: str, url_root: str, segments: Any = None) -> jsonify:
+    """Queue a local reels render for an uploaded file and answer with its jobId"""
+    response = queue_reels_job(filepath, title, template_key, encoding_profile, mp4_mode, url_root, segments)
+    if response is None:
+        return render_queue_full_response()
+    return jsonify(response)
+
+def queue_reels_job(filepath: str, title: str, template_key: str, encoding_profile: str,
+                    mp4_mode: str, url_root: str, segments: Any = None) -> Optional[Dict[str, Any]]:
+    """Queue a local reels render; returns the response fields, or None when the queue is full"""
+    prefix = f"{template_key}_preview" if encoding_profile == 'preview' else template_key
+    out_filename = generate_filename(prefix, "mp4")
+    fragmented = mp4_mode == 'fragmented'
+    job_id = submit_render_job(
+        generate_local_reels_video, filepath, title, template_key,
+        url_root=url_root,
+        encoding_profile=encoding_profile,
+        mp4_mode=mp4_mode,
+        out_filename=out_filename,
+        segments=segments,
+        preview_path=os.path.join(Config.UPLOAD_FOLDER, out_filename) if fragmented else None,
+        preview_url=build_public_url(out_filename, url_root) if fragmented else None,
+        cache_key=render_cache_key(filepath, title, template_key, encoding_profile, mp4_mode)
+    )
+    if not job_id:
+        return None
+    job = get_render_job(job_id)
+    if job['status'] == 'done':
+        return success_response(
+            "Reels gerado com sucesso!",
+            jobId=job_id,
+            status="done",
+            profile=encoding_profile,
+            cached=True,
+            **job['result']
+        )
+    return success_response(
+        "Reels em processamento...",
+        jobId=job_id,
+        status=job['status'],
+        profile=encoding_profile
+    )
+
+_fanout_executor = ThreadPoolExecutor(max_workers=Config.FANOUT_WORKERS, thread_name_prefix="fanout")
+
+def handle_generate_all(payload: Dict[str, Any], request) -> jsonify:
+    """
+    Generate several templates from one upload: the file is saved once, local
+    reels and images are queued as render jobs (process pool, cache,
+    single-flight) and Placid posts are created concurrently on I/O threads.
+    Answers with one result (or jobId) per template.
+    """
+    file = request.files.get('file') if hasattr(request, 'files') else None
+    if not file:
+        return jsonify(error_response("No file provided"))
+
+    template_keys = list(dict.fromkeys(payload.get('templates') or []))
+    if not template_keys:
+        return jsonify(error_response("At least one template is required"))
+    known = set(PLACID_TEMPLATES) | set(LOCAL_REELS_TEMPLATES) | set(LOCAL_IMAGE_TEMPLATES)
+    unknown = [key for key in template_keys if key not in known]
+    if unknown:
+        logger.error(f"❌ Unknown templates: {unknown}")
+        return jsonify(error_response(f"Unknown templates: {', '.join(unknown)}"))
+
+    title = payload.get('title', '')
+    subject = payload.get('subject', '')
+    credits = payload.get('credits', '')
+    encoding_profile = payload.get('profile') or DEFAULT_ENCODING_PROFILE
+    mp4_mode = payload.get('mp4Mode') or Config.REELS_MP4_MODE
+    if payload.get('preview'):
+        encoding_profile = 'preview'
+    image_format = payload.get('imageFormat')
+
+    # Mesmas validações do generate_post, antes de gravar o upload
+    if (not subject or not credits) and any(PLACID_TEMPLATES.get(key, {}).get('type') == 'feed'
+                                            for key in template_keys):
+        return jsonify(error_response("Feed templates require subject and credits"))
+    if any(key in LOCAL_REELS_TEMPLATES for key in template_keys):
+        if encoding_profile not in ENCODING_PROFILES:
+            return jsonify(error_response(f"Unknown encoding profile: {encoding_profile}"))
+        if mp4_mode not in MP4_MOVFLAGS:
+            return jsonify(error_response(f"Unknown MP4 mode: {mp4_mode}"))
+    if image_format and image_format not in IMAGE_OUTPUT_FORMATS:
+        return jsonify(error_response(f"Unknown image format: {image_format}"))
+
+    success, filepath, public_url = save_uploaded_file(file, "post")
+    if not success:
+        logger.error(f"❌ File upload failed: {public_url}")
+        return jsonify(error_response(public_url))
+    logger.info(f"🗂️ generate_all: {len(template_keys)} templates a partir de {os.path.basename(filepath)}")
+
+    url_root = request.url_root
+    futures = {}
+    results: Dict[str, Dict[str, Any]] = {}
+    for key in template_keys:
+        if key in LOCAL_REELS_TEMPLATES:
+            response = queue_reels_job(filepath, title, key, encoding_profile, mp4_mode, url_root,
+                                       payload.get('segments'))
+        elif key in LOCAL_IMAGE_TEMPLATES:
+            response = queue_image_job(filepath, title, key,
+                                       image_format or LOCAL_IMAGE_TEMPLATES[key]['image_format'], url_root)
+        else:
+            futures[key] = _fanout_executor.submit(create_placid_post, key, public_url, title, subject, credits)
+            continue
+        results[key] = response or error_response(
+            "Fila de renderização cheia. Tente novamente em instantes.",
+            retryAfter=Config.RENDER_RETRY_AFTER
+        )
+
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            logger.error(f"❌ generate_all {key} failed: {type(e).__name__}: {e}")
+            results[key] = error_response("Failed to create post")
+
+    failed = [key for key in template_keys if not results[key]['success']]
+    if failed:
+        logger.warning(f"⚠️ generate_all: falharam {failed}")
+    return jsonify(success_response(
+        f"{len(template_keys) - len(failed)} de {len(template_keys)} templates gerados",
+        results={key: results[key] for key in template_keys},
+        failed=failed
+    ))
+
+def queue_image_job(filepath: str, title: str, template_key: str, image_format: str,
+                    url_root: str) -> Optional[Dict[str, Any]]:
+    """Queue a local image render; returns the response fields, or None when the queue is full"""
+    job_id = submit_render_job(
+        generate_local_reels_image, filepath, title, template_key,
+        url_root=url_root,
+        image_format=image_format,
+        cache_key=render_cache_key(filepath, title, template_key, '', image_format)
+    )
+    if not job_id:
+        return None
+    job = get_render_job(job_id)
+    if job['status'] == 'done':
+        return success_response(
+            "Imagem gerada com sucesso!",
+            jobId=job_id,
+            status="done",
+            cached=True,
+            **job['result']
+        )
+    return success_response(
+        "Imagem em processamento...",
+        jobId=job_id,
+        status=job['status']
+    )
+
+def handle_finalize_reels(payload: Dict[str, Any], request) -> jsonify:
+    """Re-render a reels preview (draft) job at full quality"""
+    job_id = payload.get('jobId', '')
+    job = get_render_job(job_id)
+    if not job:
+        logger.error(f"❌ Preview job not found: {job_id}")
+        return jsonify(error_response("Job not found"))
+    if job['encodingProfile'] != 'preview':
+        return jsonify(error_response("Only preview jobs can be finalized"))
+
+    encoding_profile = payload.get('profile') or DEFAULT_ENCODING_PROFILE
+    if encoding_profile not in ENCODING_PROFILES or encoding_profile == 'preview':
+        logger.error(f"❌ Unknown encoding profile: {encoding_profile}")
+        return jsonify(error_response(f"Unknown encoding profile: {encoding_profile}"))
+
+    _, args, kwargs = job['render']
+    filepath, title, template_key = args
+    logger.info(f"🎬 Finalizing preview job {job_id} with profile {encoding_profile}")
+    return submit_reels_job(filepath, title, template_key, encoding_profile,
+                            kwargs.get('mp4_mode') or Config.REELS_MP4_MODE, request.url_root,
+                            kwargs.get('segments'))
 
 def handle_generate_title(payload: Dict[str, Any], request) -> jsonify:
     """Handle title generation with AI"""
@@ -1567,6 +3157,9 @@ def handle_save_title(payload: Dict[str, Any], request) -> jsonify:
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
     """Serve uploaded files"""
+    if filename.startswith('.'):
+        # Arquivos internos (ex.: índice do cache de renders)
+        return "File not found", 404
     try:
         return send_from_directory(Config.UPLOAD_FOLDER, filename)
     except Exception as e:
@@ -1620,6 +3213,49 @@ def check_image_status(image_id):
         logger.error(f"Error checking image status {image_id}: {e}")
         return jsonify(error_response("Error checking image status")), 500
 
+@app.route('/api/render-cache')
+def render_cache_status():
+    """Render cache hit/miss counters and size"""
+    return jsonify(success_response("Render cache", titleOverlays=title_overlay_stats_all(), **render_cache_stats()))
+
+@app.route('/api/job/<job_id>')
+def check_render_job(job_id):
+    """Check local render job status (queued/running/done/failed)"""
+    job = get_render_job(job_id)
+    if not job:
+        return jsonify(error_response("Job not found")), 404
+
+    status = job['status']
+    if status == 'done':
+        return jsonify(success_response(
+            "Imagem gerada com sucesso!" if 'imageUrl' in job['result'] else "Reels gerado com sucesso!",
+            jobId=job_id,
+            status="done",
+            profile=job['encodingProfile'],
+            cached=job['cached'],
+            encoding=job['encoding'],
+            **job['result']
+        ))
+    elif status == 'failed':
+        return jsonify(error_response(
+            job['error'] or "Falha ao gerar reels localmente",
+            jobId=job_id,
+            status="failed",
+            encoding=job['encoding']
+        ))
+    else:
+        # fMP4 já pode ser reproduzido enquanto o render ainda grava o arquivo
+        preview = {}
+        if status == 'running' and job['previewUrl'] and os.path.exists(job['previewPath']):
+            preview['previewUrl'] = job['previewUrl']
+        return jsonify(success_response(
+            "Reels em processamento",
+            jobId=job_id,
+            status=status,
+            encoding=job['encoding'],
+            **preview
+        ))
+
 # HTML Template
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -2082,6 +3718,7 @@ HTML_TEMPLATE = """
                         <div class="error-message" id="post-error"></div>
 
                         <button class="btn btn-primary" onclick="generatePost()">Gerar Post</button>
+                        <button class="btn btn-secondary" onclick="generatePost(true)" style="margin-left: 10px;" id="preview-post-btn">⚡ Prévia Rápida (Reels)</button>
                     </div>
                     <div>
                         <div class="preview-area">
@@ -2092,6 +3729,7 @@ HTML_TEMPLATE = """
                         <button class="btn btn-success" onclick="downloadFile('post')" style="display: none;" id="download-post-btn">📥 Download Post</button>
                         <a href="#" id="open-post-image" class="btn btn-secondary" style="margin-left: 10px; display: none;" target="_blank">🖼️ Abrir Imagem</a>
                         <a href="#" id="open-post-video" class="btn btn-secondary" style="margin-left: 10px; display: none;" target="_blank">🎬 Abrir Vídeo</a>
+                        <button class="btn btn-primary" onclick="finalizeReels()" style="margin-left: 10px; display: none;" id="finalize-post-btn">✅ Finalizar Reels</button>
                     </div>
                 </div>
             </div>
@@ -2253,6 +3891,7 @@ HTML_TEMPLATE = """
             reels: [
                 { key: 'reels_modelo_1', label: 'Reels 1 - Centralizado', icon: '🎬'},
                 { key: 'reels_modelo_2', label: 'Reels 2 - Lateral', icon: '🎬'},
+                { key: 'reels_image', label: 'Reels - Imagem', icon: '🖼️'},
             ]
         };
 
@@ -2432,6 +4071,11 @@ HTML_TEMPLATE = """
                     body: formData,
                 });
                 
+                // 429: fila de renderização cheia, a mensagem vem no corpo
+                if (response.status === 429) {
+                    return await response.json();
+                }
+                
                 if (!response.ok) {
                     throw new Error(`HTTP error! status: ${response.status}`);
                 }
@@ -2475,8 +4119,82 @@ HTML_TEMPLATE = """
             }
         }
 
-        // Generate post
-        async function generatePost() {
+        // Show generated reels video
+        function showPostVideo(videoUrl) {
+            generatedImageUrls.post = videoUrl;
+            const preview = document.getElementById('post-preview');
+            preview.innerHTML = `<video controls style="max-width: 100%; max-height: 300px; border-radius: 10px;"><source src="${videoUrl}" type="video/mp4"></video>`;
+            showSuccess('Reels gerado com sucesso!', 'post');
+            
+            // Mostra botões para vídeo
+            document.getElementById('download-post-btn').style.display = 'inline-block';
+            document.getElementById('open-post-video').href = videoUrl;
+            document.getElementById('open-post-video').style.display = 'inline-block';
+            document.getElementById('open-post-image').style.display = 'none';
+        }
+
+        function showPostImage(imageUrl) {
+            generatedImageUrls.post = imageUrl;
+            const preview = document.getElementById('post-preview');
+            preview.innerHTML = `<img src="${imageUrl}" style="max-width: 100%; max-height: 300px; border-radius: 10px; object-fit: contain;">`;
+            showSuccess('Post gerado com sucesso!', 'post');
+            
+            // Mostra botões para imagem
+            document.getElementById('download-post-btn').style.display = 'inline-block';
+            document.getElementById('open-post-image').href = imageUrl;
+            document.getElementById('open-post-image').style.display = 'inline-block';
+            document.getElementById('open-post-video').style.display = 'none';
+        }
+
+        // Check local render job status
+        const previewedJobs = new Set();
+        async function checkRenderJob(jobId, type) {
+            try {
+                const response = await fetch(`/api/job/${jobId}`);
+                const result = await response.json();
+                
+                if (result.success && result.status === 'done' && result.videoUrl) {
+                    showPostVideo(result.videoUrl);
+                    // Prévia aprovada? O editor finaliza com o render completo
+                    previewJobId = result.profile === 'preview' ? jobId : null;
+                    document.getElementById('finalize-post-btn').style.display = previewJobId ? 'inline-block' : 'none';
+                } else if (result.success && result.status === 'done' && result.imageUrl) {
+                    showPostImage(result.imageUrl);
+                } else if (result.success && (result.status === 'queued' || result.status === 'running')) {
+                    // fMP4: mostra a prévia parcial enquanto o render continua
+                    if (result.previewUrl && !previewedJobs.has(jobId)) {
+                        previewedJobs.add(jobId);
+                        const preview = document.getElementById(`${type}-preview`);
+                        preview.innerHTML = `<video controls autoplay muted style="max-width: 100%; max-height: 300px; border-radius: 10px;"><source src="${result.previewUrl}" type="video/mp4"></video>`;
+                    }
+                    setTimeout(() => checkRenderJob(jobId, type), 3000);
+                } else {
+                    showError(result.message || 'Erro ao gerar reels', type);
+                }
+            } catch (error) {
+                console.error('Error checking job:', error);
+                showError('Erro ao verificar status do reels', type);
+            }
+        }
+
+        // Finalize reels: render completo a partir da prévia aprovada
+        let previewJobId = null;
+        async function finalizeReels() {
+            if (!previewJobId) return;
+            document.getElementById('finalize-post-btn').style.display = 'none';
+            showLoading('post');
+            const apiResult = await sendToAPI('finalize_reels', { jobId: previewJobId });
+            hideLoading('post');
+            if (apiResult.success && apiResult.jobId) {
+                showSuccess('Reels final em processamento. Aguarde...', 'post');
+                checkRenderJob(apiResult.jobId, 'post');
+            } else {
+                showError(apiResult.message || 'Erro ao finalizar reels', 'post');
+            }
+        }
+
+        // Generate post (preview: rascunho rápido dos reels locais)
+        async function generatePost(preview = false) {
             if (!uploadedFiles.post) {
                 showError('Por favor, faça upload de um arquivo primeiro.', 'post');
                 return;
@@ -2505,34 +4223,22 @@ if (selectedTemplate.includes('reels') && !titulo) {
                 template: selectedTemplate,
                 title: titulo,
                 subject: assunto,
-                credits: creditos
+                credits: creditos,
+                preview: preview
             }, uploadedFiles.post);
 
             hideLoading('post');
             
             if (apiResult.success) {
                 if (apiResult.videoUrl) {
-                    generatedImageUrls.post = apiResult.videoUrl;
-                    const preview = document.getElementById('post-preview');
-                    preview.innerHTML = `<video controls style="max-width: 100%; max-height: 300px; border-radius: 10px;"><source src="${apiResult.videoUrl}" type="video/mp4"></video>`;
-                    showSuccess('Reels gerado com sucesso!', 'post');
-                    
-                    // Mostra botões para vídeo
-                    document.getElementById('download-post-btn').style.display = 'inline-block';
-                    document.getElementById('open-post-video').href = apiResult.videoUrl;
-                    document.getElementById('open-post-video').style.display = 'inline-block';
-                    document.getElementById('open-post-image').style.display = 'none';
+                    showPostVideo(apiResult.videoUrl);
+                    previewJobId = apiResult.profile === 'preview' ? apiResult.jobId : null;
+                    document.getElementById('finalize-post-btn').style.display = previewJobId ? 'inline-block' : 'none';
                 } else if (apiResult.imageUrl) {
-                    generatedImageUrls.post = apiResult.imageUrl;
-                    const preview = document.getElementById('post-preview');
-                    preview.innerHTML = `<img src="${apiResult.imageUrl}" style="max-width: 100%; max-height: 300px; border-radius: 10px; object-fit: contain;">`;
-                    showSuccess('Post gerado com sucesso!', 'post');
-                    
-                    // Mostra botões para imagem
-                    document.getElementById('download-post-btn').style.display = 'inline-block';
-                    document.getElementById('open-post-image').href = apiResult.imageUrl;
-                    document.getElementById('open-post-image').style.display = 'inline-block';
-                    document.getElementById('open-post-video').style.display = 'none';
+                    showPostImage(apiResult.imageUrl);
+                } else if (apiResult.jobId) {
+                    showSuccess('Reels em processamento. Aguarde...', 'post');
+                    checkRenderJob(apiResult.jobId, 'post');
                 } else if (apiResult.imageId) {
                     showSuccess('Post em processamento. Aguarde...', 'post');
                     checkImageStatus(apiResult.imageId, 'post');
@@ -2815,6 +4521,7 @@ if __name__ == '__main__':
     logger.info("🚀 Starting SaaS Editor...")
     logger.info(f"🎨 Placid API: {Config.PLACID_API_URL}")
     logger.info(f"📋 Templates available: {len(PLACID_TEMPLATES)}")
+    logger.info(f"🔤 Fontes: {warm_fonts()}")
     
     for key, template in PLACID_TEMPLATES.items():
         logger.info(f"   - {template['name']}: {template['uuid']}")